@@ -1,6 +1,8 @@
+from serpy.cache import RepresentationCache
 from serpy.fields import (
-    Field, BoolField, IntField, FloatField, MethodField, StrField)
-from serpy.serializer import Serializer, DictSerializer
+    Field, BoolField, IntField, FloatField, ListField, DictField, MethodField,
+    BatchMethodField, StrField)
+from serpy.serializer import Serializer, DictSerializer, RowSerializer
 
 __version__ = '0.0.3'
 __author__ = 'Clark DuVall'
@@ -9,10 +11,15 @@ __license__ = 'MIT'
 __all__ = [
     'Serializer',
     'DictSerializer',
+    'RowSerializer',
     'Field',
     'BoolField',
     'IntField',
     'FloatField',
+    'ListField',
+    'DictField',
     'MethodField',
+    'BatchMethodField',
     'StrField',
+    'RepresentationCache',
 ]
@@ -0,0 +1,115 @@
+"""Serializers whose method fields can be coroutines. Requires Python 3.7+."""
+import asyncio
+import contextvars
+import inspect
+
+from serpy.fields import MethodField
+from serpy.serializer import Serializer
+
+# The awaitables found while serializing, as (container, key, awaitable)
+# tuples. Only set while AsyncSerializer.arepresentation is running.
+_pending = contextvars.ContextVar('serpy_pending', default=None)
+
+
+class AsyncMethodField(MethodField):
+    """A :class:`serpy.MethodField` whose method may be a coroutine function.
+
+    The awaitables returned by the method are collected while serializing and
+    awaited concurrently by :meth:`AsyncSerializer.arepresentation`. Example:
+    ::
+
+        class FooSerializer(AsyncSerializer):
+            owner = AsyncMethodField()
+
+            async def get_owner(self, foo_obj):
+                return await cache.get(foo_obj.owner_id)
+
+        await FooSerializer(foos, many=True).arepresentation()
+
+    Serializers with an ``AsyncMethodField``, and the serializers they are
+    nested in, don't use their ``representation_cache``, as the serialized
+    dicts are filled in after the awaitables are resolved.
+    """
+    _serpy_cacheable = False
+
+
+class AsyncSerializer(Serializer):
+    """A :class:`serpy.Serializer` that supports :class:`AsyncMethodField`.
+
+    Use :meth:`AsyncSerializer.arepresentation` instead of
+    :attr:`serpy.Serializer.representation` to get the serialized data.
+    ``AsyncSerializer`` can be nested in other serializers, and its awaitables
+    are then awaited with the ones of the top-level serializer. ``lazy`` is
+    ignored, as every object has to be serialized before the awaitables are
+    gathered, and ``rows`` raises a ``ValueError``.
+    """
+
+    @classmethod
+    def _async_field_names(cls):
+        names = cls.__dict__.get('_serpy_async_field_names')
+        if names is None:
+            names = tuple(name for name, field in cls._field_map.items()
+                          if isinstance(field, AsyncMethodField))
+            cls._serpy_async_field_names = names
+        return names
+
+    def to_representation(self, obj):
+        names = self._async_field_names()
+        if names and self.rows:
+            raise ValueError(
+                '{0} has async method fields and can\'t be serialized with '
+                'rows=True'.format(type(self).__name__))
+        result = super(AsyncSerializer, self).to_representation(obj)
+        if self.many and not isinstance(result, list):
+            result = list(result)
+
+        pending = _pending.get()
+        if names and self._projection is not None:
+            projected = set(field[0] for field in
+                            self._projected_read_fields())
+            names = [name for name in names if name in projected]
+        if pending is None or not names:
+            return result
+
+        isawaitable = inspect.isawaitable
+        for v in (result if self.many else (result,)):
+            for name in names:
+                value = v[name]
+                if isawaitable(value):
+                    pending.append((v, name, value))
+        return result
+
+    async def arepresentation(self, limit=None):
+        """Get the serialized data, awaiting every async method field.
+
+        The awaitables of every field of every object, including the ones of
+        nested serializers, are awaited concurrently. The result is cached
+        like :attr:`serpy.Serializer.representation`.
+
+        :param int limit: The maximum number of awaitables to run at once.
+            Defaults to no limit.
+        """
+        if self._representation is None:
+            pending = []
+            token = _pending.set(pending)
+            try:
+                result = self.to_representation(self._initial_obj)
+            finally:
+                _pending.reset(token)
+            await _resolve(pending, limit)
+            self._representation = result
+        return self._representation
+
+
+async def _resolve(pending, limit):
+    if limit is None:
+        async def resolve(container, key, awaitable):
+            container[key] = await awaitable
+    else:
+        semaphore = asyncio.Semaphore(limit)
+
+        async def resolve(container, key, awaitable):
+            async with semaphore:
+                container[key] = await awaitable
+
+    await asyncio.gather(*[resolve(*p) for p in pending])
@@ -0,0 +1,4 @@
+"""A self-contained benchmark suite for serpy. Run it with::
+
+    python -m serpy.benchmarks --help
+"""
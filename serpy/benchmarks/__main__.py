@@ -0,0 +1,72 @@
+import argparse
+import sys
+
+from serpy.benchmarks import runner
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m serpy.benchmarks',
+        description='Benchmark serpy on synthetic object graphs.')
+    parser.add_argument(
+        '-b', '--benchmark', action='append', choices=list(runner.BENCHMARKS),
+        help='Benchmark to run, can be repeated. Defaults to all of them.')
+    parser.add_argument(
+        '--width', type=int,
+        help='Run a custom scenario with this many fields per object '
+             'instead of the default scenarios.')
+    parser.add_argument('--depth', type=int, default=0,
+                        help='Nesting depth of the custom scenario.')
+    parser.add_argument('--fanout', type=int, default=1,
+                        help='Size of the nested lists of the custom '
+                             'scenario.')
+    parser.add_argument('--objects', type=int, default=1000,
+                        help='Number of top-level objects of the custom '
+                             'scenario.')
+    parser.add_argument('-r', '--repeat', type=int, default=10,
+                        help='Number of timed runs.')
+    parser.add_argument('-w', '--warmup', type=int, default=2,
+                        help='Number of untimed runs before timing.')
+    parser.add_argument('-m', '--memory', action='store_true',
+                        help='Also measure allocations with tracemalloc.')
+    parser.add_argument('-o', '--output',
+                        help='Write the results to this JSON file.')
+    parser.add_argument('--baseline',
+                        help='Compare against the results in this JSON file '
+                             'and exit with status 1 on regressions.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown counted as a regression.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None, out=sys.stdout):
+    args = parse_args(argv)
+
+    def log(line):
+        out.write(line + '\n')
+
+    scenarios = runner.DEFAULT_SCENARIOS
+    if args.width is not None:
+        scenarios = [runner.Scenario(
+            'custom', args.width, args.depth, args.fanout, args.objects)]
+
+    results = runner.run(scenarios, args.benchmark, args.repeat, args.warmup,
+                         args.memory, log=log)
+    if args.output:
+        runner.save(results, args.output)
+
+    if not args.baseline:
+        return 0
+    regressions = 0
+    log('')
+    for comparison in runner.compare(results, runner.load(args.baseline),
+                                     args.threshold):
+        regressions += comparison.regression
+        log('{0:<32} {1:>7.1%}{2}'.format(
+            comparison.name, comparison.ratio - 1,
+            '  REGRESSION' if comparison.regression else ''))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import collections
+import gc
+import json
+import math
+import platform
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # Python < 3.4.
+    tracemalloc = None
+
+import serpy
+from serpy.benchmarks.schemas import count_nodes, make_objects, make_serializer
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+#: The shape of the object graphs of a benchmark scenario. ``objects`` is
+#: the number of top-level objects serialized in one run.
+Scenario = collections.namedtuple(
+    'Scenario', ['name', 'width', 'depth', 'fanout', 'objects'])
+
+DEFAULT_SCENARIOS = (
+    Scenario('flat', width=6, depth=0, fanout=1, objects=1000),
+    Scenario('nested', width=4, depth=2, fanout=3, objects=100),
+    Scenario('wide', width=48, depth=0, fanout=1, objects=200),
+)
+
+
+def summarize(times):
+    """Compute statistics of a list of run times, in seconds."""
+    times = sorted(times)
+    n = len(times)
+    mean = sum(times) / n
+    if n % 2:
+        median = times[n // 2]
+    else:
+        median = (times[n // 2 - 1] + times[n // 2]) / 2
+    stdev = 0.0
+    if n > 1:
+        stdev = math.sqrt(sum((t - mean) ** 2 for t in times) / (n - 1))
+    return {'min': times[0], 'max': times[-1], 'mean': mean,
+            'median': median, 'stdev': stdev, 'repeat': n}
+
+
+def measure(fn, repeat=10, warmup=2, timer=_timer):
+    """Time ``fn`` after ``warmup`` untimed calls, ``repeat`` times."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = timer()
+        fn()
+        times.append(timer() - start)
+    return summarize(times)
+
+
+def measure_memory(fn):
+    """Measure the memory allocated by one call of ``fn`` with tracemalloc.
+
+    Returns the ``peak`` number of bytes allocated during the call, and the
+    number of bytes (``retained``) and memory blocks (``retained_blocks``)
+    allocated by the call and still held when it returns, which includes its
+    result. Blocks allocated and freed during the call aren't counted, as
+    tracemalloc only tracks live blocks, so ``retained_blocks`` is not the
+    total number of allocations made.
+    """
+    if tracemalloc is None:
+        raise RuntimeError('Memory benchmarks require tracemalloc')
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        snapshot = tracemalloc.take_snapshot()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)])
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    del result
+    return {'peak': peak, 'retained': retained, 'retained_blocks': blocks}
+
+
+def _build(scenario):
+    serializer_cls = make_serializer(
+        scenario.width, scenario.depth, scenario.fanout)
+    objs = make_objects(
+        scenario.objects, scenario.width, scenario.depth, scenario.fanout)
+    return serializer_cls, objs
+
+
+def serialize_benchmark(scenario):
+    """Build the function serializing the objects of ``scenario``."""
+    serializer_cls, objs = _build(scenario)
+    return lambda: serializer_cls(objs, many=True).representation
+
+
+def deserialize_benchmark(scenario):
+    """Build the function deserializing the data of ``scenario``.
+
+    The data is the representation of the objects of the scenario, so nested
+    serializers and ``many=True`` fields are deserialized too.
+    """
+    serializer_cls, objs = _build(scenario)
+    data = serializer_cls(objs, many=True).representation
+    return lambda: serializer_cls(data=data, many=True).internal_value
+
+
+#: The benchmarks run for each scenario, by name. Each builds the function
+#: to time from a scenario.
+BENCHMARKS = collections.OrderedDict([
+    ('serialize', serialize_benchmark),
+    ('deserialize', deserialize_benchmark),
+])
+
+
+def run(scenarios=DEFAULT_SCENARIOS, benchmarks=None, repeat=10, warmup=2,
+        memory=False, log=None):
+    """Run every benchmark for every scenario.
+
+    Returns the results as a dict that can be saved as JSON, with the
+    statistics of each benchmark under ``'benchmarks'``, keyed by
+    ``'<benchmark>/<scenario>'``. ``per_object`` is the median time per
+    object in the graphs, including nested ones.
+
+    :param benchmarks: The names of the benchmarks to run. Defaults to all of
+        them.
+    :param bool memory: Also measure the memory allocated by each benchmark,
+        with :func:`measure_memory`, under ``'memory'``.
+    :param log: A function called with a line of text after each benchmark.
+    """
+    if benchmarks is None:
+        benchmarks = list(BENCHMARKS)
+    results = collections.OrderedDict()
+    memory_results = collections.OrderedDict()
+    for benchmark in benchmarks:
+        for scenario in scenarios:
+            name = '{0}/{1}'.format(benchmark, scenario.name)
+            fn = BENCHMARKS[benchmark](scenario)
+            nodes = scenario.objects * count_nodes(
+                scenario.depth, scenario.fanout)
+            if memory:
+                stats = measure_memory(fn)
+                stats['objects'] = nodes
+                for key in ('peak', 'retained', 'retained_blocks'):
+                    stats[key + '_per_object'] = stats[key] / float(nodes)
+                memory_results[name] = stats
+                if log is not None:
+                    log('{0:<24} {1:>12.1f} bytes/object peak, {2:.1f} '
+                        'blocks/object retained'.format(
+                            name, stats['peak_per_object'],
+                            stats['retained_blocks_per_object']))
+
+            stats = measure(fn, repeat, warmup)
+            stats['objects'] = nodes
+            stats['per_object'] = stats['median'] / nodes
+            stats['scenario'] = scenario._asdict()
+            results[name] = stats
+            if log is not None:
+                log('{0:<24} {1:>12.3f} us/object  (+-{2:.1%})'.format(
+                    name, stats['per_object'] * 1e6,
+                    stats['stdev'] / stats['mean'] if stats['mean'] else 0))
+    return {
+        'serpy': serpy.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'benchmarks': results,
+        'memory': memory_results,
+    }
+
+
+#: The comparison of one benchmark with its baseline, see :func:`compare`.
+Comparison = collections.namedtuple(
+    'Comparison', ['name', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def compare(results, baseline, threshold=0.1):
+    """Compare ``results`` against ``baseline`` results.
+
+    Benchmarks are compared on their median time per object, and memory
+    measurements on their peak bytes per object, with names prefixed by
+    ``'memory:'``. Only the benchmarks present in both are compared.
+
+    :param float threshold: The relative increase above which a benchmark is
+        flagged as a regression.
+    :returns: A list of :class:`Comparison`.
+    """
+    comparisons = []
+    for section, prefix, key in (('benchmarks', '', 'per_object'),
+                                 ('memory', 'memory:', 'peak_per_object')):
+        before_section = baseline.get(section, {})
+        for name, stats in results.get(section, {}).items():
+            if name not in before_section:
+                continue
+            before = before_section[name][key]
+            after = stats[key]
+            ratio = after / before if before else float('inf')
+            comparisons.append(Comparison(
+                prefix + name, before, after, ratio, ratio > 1 + threshold))
+    return comparisons
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
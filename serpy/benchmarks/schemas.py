@@ -0,0 +1,90 @@
+import itertools
+
+from serpy.fields import (
+    BoolField, Field, FloatField, IntField, MethodField, StrField)
+from serpy.serializer import Serializer
+
+# The fields cycled through to build the scalar fields of a schema, with a
+# function building the value of the i-th object for each.
+_FIELD_TYPES = (
+    (IntField, lambda i: i),
+    (StrField, lambda i: 'value {0}'.format(i)),
+    (FloatField, lambda i: i / 3.0),
+    (BoolField, lambda i: i % 2 == 0),
+    (Field, lambda i: i),
+    (MethodField, lambda i: i),
+)
+
+_serializer_ids = itertools.count()
+
+
+class Obj(object):
+    """A plain object holding the attributes of a generated graph node."""
+
+
+def make_serializer(width, depth=0, fanout=1):
+    """Build a serializer class for a synthetic schema.
+
+    Every level of the schema has ``width`` scalar fields of various types,
+    and, while ``depth`` is above 0, a nested serializer field ``child`` and a
+    ``many=True`` nested serializer field ``children`` one level deeper.
+    :func:`make_objects` builds matching objects. Every field can be
+    deserialized, into instances of :class:`Obj`.
+
+    :param int width: The number of scalar fields per level.
+    :param int depth: The number of nested levels below the top one.
+    :param int fanout: The number of objects in each ``children`` list.
+    """
+    attrs = {'_cls': Obj}
+    for i in range(width):
+        field_cls = _FIELD_TYPES[i % len(_FIELD_TYPES)][0]
+        name = 'f{0}'.format(i)
+        if field_cls is MethodField:
+            # The method reads and transforms its attribute, so it does a
+            # little work like real method fields do.
+            attrs[name] = MethodField()
+            attrs['get_' + name], attrs['set_' + name] = _make_methods(i)
+        else:
+            attrs[name] = field_cls()
+    if depth > 0:
+        child = make_serializer(width, depth - 1, fanout)
+        attrs['child'] = child()
+        attrs['children'] = child(many=True)
+    name = 'Bench{0}Serializer'.format(next(_serializer_ids))
+    return type(name, (Serializer,), attrs)
+
+
+def _make_methods(i):
+    attr = 'f{0}'.format(i)
+
+    def get(self, obj):
+        return getattr(obj, attr) + 1
+
+    def set(self, obj, value):
+        setattr(obj, attr, value - 1)
+    return get, set
+
+
+def make_object(i, width, depth=0, fanout=1):
+    """Build the ``i``-th object of the schema of :func:`make_serializer`."""
+    obj = Obj()
+    for j in range(width):
+        setattr(obj, 'f{0}'.format(j),
+                _FIELD_TYPES[j % len(_FIELD_TYPES)][1](i + j))
+    if depth > 0:
+        obj.child = make_object(i, width, depth - 1, fanout)
+        obj.children = [make_object(i + k, width, depth - 1, fanout)
+                        for k in range(fanout)]
+    return obj
+
+
+def make_objects(count, width, depth=0, fanout=1):
+    """Build ``count`` objects for the schema of :func:`make_serializer`."""
+    return [make_object(i, width, depth, fanout) for i in range(count)]
+
+
+def count_nodes(depth, fanout):
+    """The number of objects in the graph of one top-level object."""
+    if depth <= 0:
+        return 1
+    return 1 + (1 + fanout) * count_nodes(depth - 1, fanout)
@@ -0,0 +1,87 @@
+import collections
+import threading
+import time
+
+_timer = getattr(time, 'monotonic', time.time)
+
+
+class RepresentationCache(object):
+    """An LRU cache of serialized objects shared by every serializer instance.
+
+    Set it as the ``representation_cache`` of a :class:`serpy.Serializer`
+    class to reuse the representation of objects that haven't changed across
+    calls. The cache is used wherever the serializer is, including as a
+    nested serializer. It isn't used by serializers with a
+    :class:`serpy.aio.AsyncMethodField`, directly or through a nested
+    serializer. Example: ::
+
+        class ProductSerializer(Serializer):
+            representation_cache = RepresentationCache(
+                key=lambda product: (product.pk, product.updated_at),
+                maxsize=10000, ttl=300)
+
+            name = Field()
+            price = FloatField()
+
+    The key must change whenever the representation of the object would, so
+    it usually includes a version or modification time. Cached dicts are
+    shared between calls, so they shouldn't be modified.
+
+    :param key: A function returning the cache key of an object. If it
+        returns ``None``, the object isn't cached.
+    :param int maxsize: The maximum number of representations to keep. The
+        least recently used ones are evicted first.
+    :param float ttl: The number of seconds after which a representation
+        expires. Defaults to never.
+    :param timer: The function giving the current time for ``ttl``.
+    """
+    def __init__(self, key, maxsize=1024, ttl=None, timer=_timer):
+        self.key = key
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get the representation stored for ``key``, or ``default``."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None or (entry[0] is not None and
+                                 entry[0] <= self.timer()):
+                self.misses += 1
+                return default
+            # Move the entry to the most recently used end.
+            self._data[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store the representation ``value`` for ``key``."""
+        expires = None
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+        with self._lock:
+            data = self._data
+            data.pop(key, None)
+            data[key] = (expires, value)
+            while len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def clear(self):
+        """Remove every representation and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Get a dict with the ``hits``, ``misses`` and current ``size``."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,430 @@
+import array
+import collections
+import json
+import mmap
+import struct
+import sys
+
+import six
+
+from serpy.encoders import _field_value
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    array.array('q')
+    _INT_TYPECODE = 'q'
+except ValueError:  # pragma: no cover
+    # Python 2 doesn't support long long arrays.
+    _INT_TYPECODE = 'l'
+
+# Maps the converters of the numeric fields to the type of their column.
+_ARRAY_TYPECODES = {
+    int: _INT_TYPECODE,
+    float: 'd',
+    bool: 'b',
+}
+
+if numpy is not None:
+    _NUMPY_DTYPES = {
+        int: numpy.int64,
+        float: numpy.float64,
+        bool: numpy.bool_,
+    }
+
+
+def _typed_column(values, to_repr, use_numpy):
+    """Put already converted numeric ``values`` into a typed array.
+
+    Returns ``None`` if the values don't fit, for example because of an
+    integer overflow.
+    """
+    try:
+        if use_numpy:
+            return numpy.fromiter(values, dtype=_NUMPY_DTYPES[to_repr],
+                                  count=len(values))
+        return array.array(_ARRAY_TYPECODES[to_repr], values)
+    except (OverflowError, ValueError):
+        return None
+
+
+def _column(serializer, objs, compiled_field, use_numpy):
+    name, getter, to_repr, call, required, pass_self = compiled_field
+    if pass_self or call or not required:
+        values = [_field_value(serializer, o, compiled_field) for o in objs]
+    else:
+        # Map the getter, then the converter, over the whole batch.
+        values = list(map(getter, objs))
+        if to_repr is not None:
+            values = list(map(to_repr, values))
+
+    if to_repr in _ARRAY_TYPECODES and (
+            required or all(v is not None for v in values)):
+        column = _typed_column(values, to_repr, use_numpy)
+        if column is not None:
+            return column
+    return values
+
+
+def serialize_columns(serializer, objs, use_numpy=None):
+    """Serialize ``objs`` to a mapping of field names to columns of values.
+
+    Each field is handled over the whole batch at once: its getter is mapped
+    over all the objects, then its converter over all the values, so no
+    per-object dicts are built. Columns of :class:`serpy.IntField`,
+    :class:`serpy.FloatField` and :class:`serpy.BoolField` values are returned
+    as NumPy arrays, or as ``array.array`` if NumPy isn't installed. Every
+    other column, and numeric columns that contain ``None`` or don't fit in
+    64 bits, is a list.
+
+    :param serializer: The :class:`serpy.Serializer` instance to use.
+    :param objs: The objects to serialize.
+    :param bool use_numpy: Whether to build NumPy arrays. Defaults to whether
+        NumPy is installed.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('NumPy is required for use_numpy=True')
+
+    if not isinstance(objs, (list, tuple)):
+        objs = list(objs)
+    return dict(
+        (compiled_field[0],
+         _column(serializer, objs, compiled_field, use_numpy))
+        for compiled_field in serializer._projected_read_fields())
+
+
+# The file format written by write_columns: the magic bytes, the length of
+# the JSON header as a little-endian uint32, the header, then the column
+# buffers, each starting on an 8-byte boundary. Numbers are little-endian.
+_MAGIC = b'SERPYCOL'
+_VERSION = 1
+_ALIGNMENT = 8
+_header_size = struct.Struct('<I')
+
+# The file types of the typed columns, with their array and memoryview
+# formats.
+_FILE_TYPES = {
+    _INT_TYPECODE: 'int64',
+    'd': 'float64',
+    'b': 'bool',
+}
+_FILE_FORMATS = {
+    'int64': (_INT_TYPECODE, 'q'),
+    'float64': ('d', 'd'),
+    'bool': ('b', '?'),
+}
+if numpy is not None:
+    _FILE_DTYPES = {
+        'int64': numpy.dtype('<i8'),
+        'float64': numpy.dtype('<f8'),
+        'bool': numpy.dtype(numpy.bool_),
+    }
+
+
+def _column_buffers(column, to_repr=None):
+    """Get the file type and buffers of a column from serialize_columns.
+
+    Numeric columns with ``None`` values, whose type is given by the
+    ``to_repr`` converter of their field, get a validity buffer after their
+    data, with a byte per row set to 1 for the non-null values.
+    """
+    if to_repr in _ARRAY_TYPECODES and not isinstance(column, array.array):
+        # Nulls are stored as zeros.
+        typed = _typed_column([to_repr() if v is None else v for v in column],
+                              to_repr, False)
+        if typed is not None:
+            file_type, buffers = _column_buffers(typed)
+            validity = bytearray(v is not None for v in column)
+            return file_type, buffers + [bytes(validity)]
+
+    if isinstance(column, array.array):
+        if sys.byteorder == 'big':  # pragma: no cover
+            column = array.array(column.typecode, column)
+            column.byteswap()
+        return _FILE_TYPES[column.typecode], [_tobytes(column)]
+
+    if all(isinstance(v, six.text_type) for v in column):
+        file_type = 'str'
+        encoded = [v.encode('utf-8') for v in column]
+    else:
+        file_type = 'json'
+        encoded = [json.dumps(v).encode('utf-8') for v in column]
+    offsets = array.array(_INT_TYPECODE, [0])
+    end = 0
+    for value in encoded:
+        end += len(value)
+        offsets.append(end)
+    if sys.byteorder == 'big':  # pragma: no cover
+        offsets.byteswap()
+    return file_type, [_tobytes(offsets), b''.join(encoded)]
+
+
+def _tobytes(column):
+    if six.PY2:  # pragma: no cover
+        return column.tostring()
+    return column.tobytes()
+
+
+def _padding(size):
+    return -size % _ALIGNMENT
+
+
+def write_columns(serializer, objs, fp):
+    """Write ``objs`` to ``fp`` in a self-describing columnar binary format.
+
+    The objects are serialized with :func:`serialize_columns`, then each
+    column is written as a contiguous buffer: :class:`serpy.IntField`,
+    :class:`serpy.FloatField` and :class:`serpy.BoolField` columns as arrays
+    of 64-bit integers, doubles or bytes, and string columns as an array of
+    ``len(objs) + 1`` offsets followed by the UTF-8 data. Numeric columns
+    with ``None`` values keep their type, with the nulls recorded in a
+    separate validity buffer. Other columns, including nested serializers,
+    are stored like string columns with each value encoded as JSON. A JSON
+    header records the field names, types and buffer positions. Read the
+    file with :class:`ColumnFile`.
+
+    :param serializer: The :class:`serpy.Serializer` instance to use.
+    :param objs: The objects to serialize.
+    :param fp: A file-like object opened in binary mode.
+    """
+    if not isinstance(objs, (list, tuple)):
+        objs = list(objs)
+    columns = serialize_columns(serializer, objs, use_numpy=False)
+
+    # Lay the buffers out first, relative to the end of the header.
+    entries = []
+    buffers = []
+    offset = 0
+    for compiled_field in serializer._projected_read_fields():
+        name = compiled_field[0]
+        file_type, column_buffers = _column_buffers(
+            columns[name], compiled_field[2])
+        positions = []
+        for buf in column_buffers:
+            positions.append([offset, len(buf)])
+            buffers.append(buf)
+            offset += len(buf) + _padding(len(buf))
+        entries.append({'name': name, 'type': file_type,
+                        'buffers': positions})
+
+    header = {'version': _VERSION, 'rows': len(objs), 'columns': entries}
+    header = json.dumps(header).encode('utf-8')
+    start = len(_MAGIC) + _header_size.size + len(header)
+    header += b' ' * _padding(start)
+    fp.write(_MAGIC)
+    fp.write(_header_size.pack(len(header)))
+    fp.write(header)
+    for buf in buffers:
+        fp.write(buf)
+        fp.write(b'\0' * _padding(len(buf)))
+
+
+class _EncodedColumn(object):
+    """A read-only sequence decoding the values of a string column lazily."""
+
+    def __init__(self, offsets, data, decode):
+        self._offsets = offsets
+        self._data = data
+        self._decode = decode
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('column index out of range')
+        offsets = self._offsets
+        return self._decode(
+            bytes(self._data[offsets[index]:offsets[index + 1]]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _decode_text(value):
+    return value.decode('utf-8')
+
+
+def _decode_json(value):
+    return json.loads(value.decode('utf-8'))
+
+
+class ColumnFile(object):
+    """Reads a file written by :func:`write_columns` through ``mmap``.
+
+    Columns are read from the mapped file without copying it: numeric
+    columns are returned as ``memoryview`` objects (or NumPy arrays) over
+    the file, and string columns as sequences decoding each value when it
+    is accessed. Only the pages of the columns that are read are loaded.
+    Rows are built on access too. Example: ::
+
+        with open('export.bin', 'wb') as f:
+            PostSerializer(posts, many=True).write_columns(f)
+
+        with ColumnFile('export.bin') as columns:
+            total = sum(columns.column('views'))
+            first = columns.row(0)
+
+    The file can only be closed once the columns read from it are no longer
+    referenced, as they point into the mapped memory.
+
+    :param path: The path of the file.
+    :param bool use_numpy: Whether to return numeric columns as NumPy arrays.
+        Defaults to whether NumPy is installed.
+    """
+    def __init__(self, path, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError('NumPy is required for use_numpy=True')
+        self.use_numpy = use_numpy
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+        self._columns = {}
+        self._validity = {}
+
+    def _read_header(self):
+        buf = self._mmap
+        magic_size = len(_MAGIC)
+        if buf[:magic_size] != _MAGIC:
+            raise ValueError('Not a serpy column file')
+        start = magic_size + _header_size.size
+        size, = _header_size.unpack(buf[magic_size:start])
+        header = json.loads(buf[start:start + size].decode('utf-8'))
+        if header.get('version') != _VERSION:
+            raise ValueError('Unsupported column file version {0}'.format(
+                header.get('version')))
+        self.rows = header['rows']
+        self._data_start = start + size
+        self._entries = collections.OrderedDict(
+            (entry['name'], entry) for entry in header['columns'])
+
+    @property
+    def names(self):
+        """The names of the columns, in field order."""
+        return list(self._entries)
+
+    def _view(self, position):
+        offset, size = position
+        offset += self._data_start
+        if six.PY2:  # pragma: no cover
+            return self._mmap[offset:offset + size]
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def _numeric(self, file_type, position):
+        if self.use_numpy:
+            offset, size = position
+            dtype = _FILE_DTYPES[file_type]
+            return numpy.frombuffer(
+                self._mmap, dtype=dtype, count=size // dtype.itemsize,
+                offset=self._data_start + offset)
+        typecode, view_format = _FILE_FORMATS[file_type]
+        view = self._view(position)
+        if six.PY2 or sys.byteorder == 'big':  # pragma: no cover
+            # No zero-copy casting of little-endian data.
+            column = array.array(typecode)
+            column.fromstring(bytes(view))
+            if sys.byteorder == 'big':
+                column.byteswap()
+            return column
+        return view.cast(view_format)
+
+    def column(self, name):
+        """Get the column of values of the field ``name``.
+
+        Numeric columns support indexing and iteration, like the other
+        columns, and the buffer protocol. The values of the null rows of
+        numeric columns are zeros, see :meth:`ColumnFile.validity`.
+        """
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+        entry = self._entries[name]
+        file_type = entry['type']
+        if file_type in _FILE_FORMATS:
+            column = self._numeric(file_type, entry['buffers'][0])
+        else:
+            offsets, data = entry['buffers']
+            offsets = self._numeric('int64', offsets)
+            decode = _decode_text if file_type == 'str' else _decode_json
+            column = _EncodedColumn(offsets, self._view(data), decode)
+        self._columns[name] = column
+        return column
+
+    def validity(self, name):
+        """Get the validity of the numeric column of the field ``name``.
+
+        Returns a column of booleans that are ``False`` for the rows whose
+        value is ``None``, or ``None`` if the column has no nulls.
+        """
+        validity = self._validity.get(name)
+        if validity is not None:
+            return validity
+        entry = self._entries[name]
+        if entry['type'] not in _FILE_FORMATS or len(entry['buffers']) < 2:
+            return None
+        validity = self._numeric('bool', entry['buffers'][1])
+        self._validity[name] = validity
+        return validity
+
+    def _value(self, name, index):
+        validity = self.validity(name)
+        if validity is not None and not validity[index]:
+            return None
+        return _item(self.column(name)[index])
+
+    def row(self, index, names=None):
+        """Get the ``index``-th row as a dict.
+
+        :param names: The names of the columns to include. Defaults to all
+            of them.
+        """
+        if names is None:
+            names = self._entries
+        return dict((name, self._value(name, index)) for name in names)
+
+    def iter_rows(self, names=None):
+        """Iterate over the rows as dicts, reading them one at a time."""
+        for i in range(self.rows):
+            yield self.row(i, names)
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        """Unmap the file.
+
+        :raises BufferError: If columns read from the file are still
+            referenced.
+        """
+        self._columns.clear()
+        self._validity.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _item(value):
+    # Converts NumPy scalars to Python values.
+    item = getattr(value, 'item', None)
+    return value if item is None else item()
@@ -0,0 +1,68 @@
+from serpy.serializer import RowSerializer
+
+
+def iter_cursor(cursor, batch_size=1000):
+    """Iterate over the rows of a DB-API ``cursor``, fetching in batches.
+
+    Rows are pulled with ``cursor.fetchmany(batch_size)`` as the iterator is
+    consumed, so only one batch is in memory at a time.
+    """
+    fetchmany = cursor.fetchmany
+    while True:
+        rows = fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield row
+
+
+def _bind(cursor, serializer_cls):
+    if issubclass(serializer_cls, RowSerializer):
+        if cursor.description is None:
+            raise ValueError('The cursor has no result set')
+        return serializer_cls.for_columns(cursor.description)
+    return serializer_cls
+
+
+def serialize_cursor(cursor, serializer_cls, batch_size=1000, **kwargs):
+    """Serialize the rows of a DB-API ``cursor``, one batch at a time.
+
+    Yields a list of serialized rows for each batch fetched with
+    ``cursor.fetchmany(batch_size)``. Each batch is serialized before the
+    next one is fetched, so memory use doesn't depend on the number of rows.
+    A :class:`serpy.RowSerializer` is bound to the columns of the cursor
+    with :meth:`serpy.RowSerializer.for_columns`. Example: ::
+
+        cursor.execute('SELECT id, username FROM users')
+        for batch in serialize_cursor(cursor, UserSerializer):
+            send(batch)
+
+    :param cursor: A DB-API cursor on which a query was executed.
+    :param serializer_cls: The :class:`serpy.Serializer` class to use.
+    :param int batch_size: The number of rows fetched at a time.
+    :param kwargs: Passed to the serializer, like ``fields`` or ``rows``.
+    """
+    serializer = _bind(cursor, serializer_cls)(many=True, **kwargs)
+    fetchmany = cursor.fetchmany
+    while True:
+        rows = fetchmany(batch_size)
+        if not rows:
+            return
+        yield serializer.to_representation(rows)
+
+
+def cursor_serializer(cursor, serializer_cls, batch_size=1000, **kwargs):
+    """Get a lazy ``many=True`` serializer over the rows of ``cursor``.
+
+    The rows are fetched with :func:`iter_cursor` as the serializer's output
+    is consumed, so it can feed the streaming writers without loading the
+    result set. Example: ::
+
+        cursor.execute('SELECT id, username FROM users')
+        with open('users.json', 'w') as f:
+            cursor_serializer(cursor, UserSerializer).write_json(f)
+
+    See :func:`serialize_cursor` for the parameters.
+    """
+    return _bind(cursor, serializer_cls)(
+        iter_cursor(cursor, batch_size), many=True, lazy=True, **kwargs)
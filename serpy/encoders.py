@@ -0,0 +1,674 @@
+import copy
+import csv
+import itertools
+import json
+import struct
+
+import six
+
+from serpy.serializer import (
+    _nested_to_representation, _select_read_fields, _uses_compiled_fields)
+
+
+def _field_value(serializer, obj, compiled_field):
+    """Get the value of a compiled read field for ``obj``.
+
+    This is what ``Serializer._serialize`` does for each field: the getter,
+    then calling the value if ``call`` is set and ``to_representation``,
+    both skipped for ``None`` values of optional fields.
+    """
+    name, getter, to_repr, call, required, pass_self = compiled_field
+    if pass_self:
+        return getter(serializer, obj)
+    value = getter(obj)
+    if required or value is not None:
+        if call:
+            value = value()
+        if to_repr:
+            value = to_repr(value)
+    return value
+
+
+def _plan_fields(serializer_cls, projection, walk_many=True):
+    """Get the fields of ``serializer_cls`` to encode, and how.
+
+    Returns ``(compiled_field, nested)`` pairs for the fields selected by
+    ``projection``. Nested serializers that can be walked through their
+    compiled fields have ``nested`` set to the ``(serializer,
+    nested_projection)`` to walk, and no ``to_representation``. Otherwise
+    ``nested`` is ``None``, and ``to_representation`` gives the value. With
+    ``walk_many`` set to ``False``, ``many=True`` nested serializers aren't
+    walked, but serialized with the compiled variant for their projection.
+    """
+    plan = []
+    for compiled_field, nested_projection in _select_read_fields(
+            serializer_cls, projection):
+        name, getter, to_repr, call, required, pass_self = compiled_field
+        nested = serializer_cls._field_map[name]
+        if not _uses_compiled_fields(nested):
+            nested = None
+        elif nested.many and not walk_many:
+            to_repr = _nested_to_representation(
+                nested, False, nested_projection, nested.rows, False)
+            nested = None
+        else:
+            to_repr = None
+            nested = (nested, nested_projection)
+        plan.append(((name, getter, to_repr, call, required, pass_self),
+                     nested))
+    return plan
+
+
+class JSONStreamEncoder(object):
+    """Encodes serializers to JSON text without building the representation.
+
+    The compiled fields of the serializer, and of any nested serializers, are
+    walked directly and JSON text is produced as it goes. For ``many=True``
+    serializers, the text is yielded in chunks of roughly ``chunk_size``
+    characters, split on object boundaries, so only a small part of the
+    output is in memory at any time.
+
+    :param int chunk_size: The approximate size of each chunk yielded by
+        :meth:`iterencode`.
+    :param kwargs: Passed to ``json.JSONEncoder``. ``indent`` is not
+        supported.
+    """
+    def __init__(self, chunk_size=65536, **kwargs):
+        if kwargs.get('indent') is not None:
+            raise ValueError('indent is not supported when streaming JSON')
+        encoder = json.JSONEncoder(**kwargs)
+        self.chunk_size = chunk_size
+        self._encoder = encoder
+        self._encode = encoder.encode
+        self._item_separator = encoder.item_separator
+        self._plans = {}
+
+    def _plan(self, serializer_cls, projection, rows):
+        plan_key = (serializer_cls, projection, rows)
+        plan = self._plans.get(plan_key)
+        if plan is not None:
+            return plan
+
+        key_separator = self._encoder.key_separator
+        plan = []
+        for compiled_field, nested in _plan_fields(serializer_cls, projection):
+            # Rows are written as arrays, without the keys.
+            key = '' if rows else self._encode(compiled_field[0]) + \
+                key_separator
+            plan.append((key, compiled_field, nested))
+        if self._encoder.sort_keys and not rows:
+            plan.sort(key=lambda entry: entry[0])
+        plan = tuple(plan)
+        self._plans[plan_key] = plan
+        return plan
+
+    def _write(self, serializer, projection, rows, obj, out):
+        write = out.append
+        encode = self._encode
+        item_separator = self._item_separator
+        rows = rows or serializer.rows
+        start = separator = '[' if rows else '{'
+        for key, compiled_field, nested in self._plan(
+                type(serializer), projection, rows):
+            write(separator)
+            separator = item_separator
+            write(key)
+            value = _field_value(serializer, obj, compiled_field)
+            if nested is None or (value is None and not compiled_field[4]):
+                write(encode(value))
+                continue
+            nested, nested_projection = nested
+            if nested.many:
+                write('[')
+                inner_separator = ''
+                for o in value:
+                    write(inner_separator)
+                    inner_separator = item_separator
+                    self._write(nested, nested_projection, rows, o, out)
+                write(']')
+            else:
+                self._write(nested, nested_projection, rows, value, out)
+        if separator != start:
+            write(']' if rows else '}')
+        else:
+            write('[]' if rows else '{}')
+
+    def _encode_one(self, serializer, obj):
+        out = []
+        self._write(serializer, serializer._projection, False, obj, out)
+        return ''.join(out)
+
+    def iterencode(self, serializer, obj):
+        """Yield the JSON text for serializing ``obj`` with ``serializer``.
+
+        :param serializer: The :class:`Serializer` instance to use. Its
+            ``many`` attribute determines whether ``obj`` is a collection.
+        :param obj: The object or objects to serialize.
+        """
+        if not _uses_compiled_fields(serializer):
+            yield self._encode(serializer.to_representation(obj))
+            return
+
+        if not serializer.many:
+            yield self._encode_one(serializer, obj)
+            return
+
+        chunk_size = self.chunk_size
+        item_separator = self._item_separator
+        pending = ['[']
+        size = 1
+        separator = ''
+        for o in obj:
+            text = self._encode_one(serializer, o)
+            pending.append(separator)
+            pending.append(text)
+            separator = item_separator
+            size += len(text)
+            if size >= chunk_size:
+                yield ''.join(pending)
+                pending = []
+                size = 0
+        pending.append(']')
+        yield ''.join(pending)
+
+
+def _cell(value):
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value)
+    return value
+
+
+class CSVEncoder(object):
+    """Encodes serializers to CSV rows without building the representation.
+
+    The header comes from the serializer's fields, with the fields of nested
+    serializers flattened into dotted column names like ``'author.name'``.
+    Rows are built straight from the compiled fields and written in batches.
+    Values of ``many=True`` nested serializers, and any other list or dict
+    values, are written as JSON. ``None`` is written as an empty cell.
+
+    :param int batch_size: The number of rows in each chunk yielded by
+        :meth:`iterencode`.
+    :param bool header: Whether to write the header row.
+    :param kwargs: Passed to ``csv.writer``, for example
+        ``dialect='excel-tab'`` to write TSV.
+    """
+    def __init__(self, batch_size=1000, header=True, **kwargs):
+        self.batch_size = batch_size
+        self.header = header
+        self._csv_kwargs = kwargs
+        self._plans = {}
+
+    def _plan(self, serializer_cls, projection):
+        plan_key = (serializer_cls, projection)
+        plan = self._plans.get(plan_key)
+        if plan is not None:
+            return plan
+
+        columns = []
+        entries = []
+        # many=True nested serializers are written as JSON cells.
+        for compiled_field, nested in _plan_fields(
+                serializer_cls, projection, walk_many=False):
+            name = compiled_field[0]
+            if nested is not None:
+                nested, nested_projection = nested
+                nested_columns = self._plan(
+                    type(nested), nested_projection)[0]
+                columns.extend(name + '.' + column
+                               for column in nested_columns)
+                nested = (nested, nested_projection, len(nested_columns))
+            else:
+                columns.append(name)
+            entries.append((compiled_field, nested))
+        plan = (tuple(columns), tuple(entries))
+        self._plans[plan_key] = plan
+        return plan
+
+    def _write(self, serializer, projection, obj, row):
+        append = row.append
+        for compiled_field, nested in self._plan(
+                type(serializer), projection)[1]:
+            value = _field_value(serializer, obj, compiled_field)
+            if nested is not None:
+                nested, nested_projection, width = nested
+                if value is None and not compiled_field[4]:
+                    row.extend((None,) * width)
+                else:
+                    self._write(nested, nested_projection, value, row)
+            else:
+                append(_cell(value))
+
+    def _rows(self, serializer, objs):
+        if _uses_compiled_fields(serializer):
+            projection = serializer._projection
+            columns = self._plan(type(serializer), projection)[0]
+            write = self._write
+
+            def rows():
+                for o in objs:
+                    row = []
+                    write(serializer, projection, o, row)
+                    yield row
+            return columns, rows()
+
+        # Serializers customizing to_representation are run on batches of
+        # objects, and their dicts are written one column per key.
+        columns = tuple(
+            compiled_field[0]
+            for compiled_field in serializer._projected_read_fields())
+        batch_serializer = copy.copy(serializer)
+        batch_serializer.many = True
+        batch_serializer.lazy = False
+
+        def rows():
+            it = iter(objs)
+            while True:
+                batch = list(itertools.islice(it, self.batch_size))
+                if not batch:
+                    return
+                for v in batch_serializer.to_representation(batch):
+                    yield [_cell(v[name]) for name in columns]
+        return columns, rows()
+
+    def iterencode(self, serializer, objs):
+        """Yield the CSV text for ``objs`` in chunks of ``batch_size`` rows.
+
+        :param serializer: The :class:`Serializer` instance to use.
+        :param objs: The objects to serialize, as any iterable. They are
+            consumed as the chunks are.
+        """
+        buf = six.StringIO()
+        writer = csv.writer(buf, **self._csv_kwargs)
+        columns, rows = self._rows(serializer, objs)
+        if self.header:
+            writer.writerow(columns)
+        batch_size = self.batch_size
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            writer.writerows(batch)
+            if buf.tell():
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if len(batch) < batch_size:
+                return
+
+
+_uint8 = struct.Struct('>BB').pack
+_uint16 = struct.Struct('>BH').pack
+_uint32 = struct.Struct('>BI').pack
+_uint64 = struct.Struct('>BQ').pack
+_int8 = struct.Struct('>Bb').pack
+_int16 = struct.Struct('>Bh').pack
+_int32 = struct.Struct('>Bi').pack
+_int64 = struct.Struct('>Bq').pack
+_float64 = struct.Struct('>Bd').pack
+
+
+def _pack_nil(value, out):
+    out.append(0xc0)
+
+
+def _pack_bool(value, out):
+    out.append(0xc3 if value else 0xc2)
+
+
+def _pack_int(value, out):
+    if 0 <= value:
+        if value < 0x80:
+            out.append(value)
+        elif value < 0x100:
+            out += _uint8(0xcc, value)
+        elif value < 0x10000:
+            out += _uint16(0xcd, value)
+        elif value < 0x100000000:
+            out += _uint32(0xce, value)
+        elif value < 0x10000000000000000:
+            out += _uint64(0xcf, value)
+        else:
+            raise OverflowError('Integer too large for MessagePack')
+    elif value >= -0x20:
+        out.append(value & 0xff)
+    elif value >= -0x80:
+        out += _int8(0xd0, value)
+    elif value >= -0x8000:
+        out += _int16(0xd1, value)
+    elif value >= -0x80000000:
+        out += _int32(0xd2, value)
+    elif value >= -0x8000000000000000:
+        out += _int64(0xd3, value)
+    else:
+        raise OverflowError('Integer too small for MessagePack')
+
+
+def _pack_float(value, out):
+    out += _float64(0xcb, value)
+
+
+def _pack_header(size, out, fix, fix_max, marker):
+    # Writes the header of a str or bin of ``size`` bytes. ``marker`` is the
+    # type byte of the 8-bit size variant, followed by the 16 and 32-bit ones.
+    if size < fix_max:
+        out.append(fix | size)
+    elif size < 0x100:
+        out += _uint8(marker, size)
+    elif size < 0x10000:
+        out += _uint16(marker + 1, size)
+    elif size < 0x100000000:
+        out += _uint32(marker + 2, size)
+    else:
+        raise ValueError('Object too large for MessagePack')
+
+
+def _pack_text(value, out):
+    value = value.encode('utf-8')
+    _pack_header(len(value), out, 0xa0, 32, 0xd9)
+    out += value
+
+
+def _pack_bin(value, out):
+    _pack_header(len(value), out, 0, 0, 0xc4)
+    out += value
+
+
+def _pack_str(value, out):
+    # Python 2 byte strings are text, like they would be in JSON.
+    _pack_header(len(value), out, 0xa0, 32, 0xd9)
+    out += value
+
+
+def _array_header(size, out):
+    if size < 16:
+        out.append(0x90 | size)
+    elif size < 0x10000:
+        out += _uint16(0xdc, size)
+    else:
+        out += _uint32(0xdd, size)
+
+
+def _map_header(size, out):
+    if size < 16:
+        out.append(0x80 | size)
+    elif size < 0x10000:
+        out += _uint16(0xde, size)
+    else:
+        out += _uint32(0xdf, size)
+
+
+def _pack_array(value, out):
+    _array_header(len(value), out)
+    for item in value:
+        _pack(item, out)
+
+
+def _pack_map(value, out):
+    _map_header(len(value), out)
+    for key, item in value.items():
+        _pack(key, out)
+        _pack(item, out)
+
+
+_PACKERS = {
+    type(None): _pack_nil,
+    bool: _pack_bool,
+    float: _pack_float,
+    six.text_type: _pack_text,
+    six.binary_type: _pack_str if six.PY2 else _pack_bin,
+    bytearray: _pack_bin,
+    list: _pack_array,
+    tuple: _pack_array,
+    dict: _pack_map,
+}
+for _type in six.integer_types:
+    _PACKERS[_type] = _pack_int
+
+
+def _pack(value, out):
+    packer = _PACKERS.get(type(value))
+    if packer is None:
+        # Subclasses of the supported types.
+        for value_type, packer in _PACKERS.items():
+            if isinstance(value, value_type):
+                break
+        else:
+            raise TypeError(
+                'Object of type {0} is not MessagePack serializable'.format(
+                    type(value).__name__))
+    packer(value, out)
+
+
+def packb(value):
+    """Encode ``value`` as MessagePack bytes.
+
+    ``None``, booleans, integers, floats, strings, bytes, lists, tuples and
+    dicts are supported. Tuples are encoded as arrays.
+    """
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+class MessagePackEncoder(object):
+    """Encodes serializers to MessagePack without building the representation.
+
+    Like :class:`JSONStreamEncoder`, the compiled fields of the serializer,
+    and of any nested serializers, are walked directly, and the encoded
+    values are appended to a ``bytearray``. The field names are encoded once
+    per serializer class. The output decodes, with :func:`unpackb`, to the
+    representation of the serializer, with tuples decoded as lists.
+
+    :param int chunk_size: The approximate size of each chunk yielded by
+        :meth:`iterencode`.
+    """
+    def __init__(self, chunk_size=65536):
+        self.chunk_size = chunk_size
+        self._plans = {}
+
+    def _plan(self, serializer_cls, projection, rows):
+        plan_key = (serializer_cls, projection, rows)
+        plan = self._plans.get(plan_key)
+        if plan is not None:
+            return plan
+
+        entries = []
+        for compiled_field, nested in _plan_fields(serializer_cls, projection):
+            key = bytearray()
+            if not rows:
+                _pack(compiled_field[0], key)
+            entries.append((bytes(key), compiled_field, nested))
+        header = bytearray()
+        if rows:
+            _array_header(len(entries), header)
+        else:
+            _map_header(len(entries), header)
+        plan = (bytes(header), tuple(entries))
+        self._plans[plan_key] = plan
+        return plan
+
+    def _write(self, serializer, projection, rows, obj, out):
+        rows = rows or serializer.rows
+        header, entries = self._plan(type(serializer), projection, rows)
+        out += header
+        for key, compiled_field, nested in entries:
+            out += key
+            value = _field_value(serializer, obj, compiled_field)
+            if nested is None or (value is None and not compiled_field[4]):
+                _pack(value, out)
+                continue
+            nested, nested_projection = nested
+            if nested.many:
+                if not isinstance(value, (list, tuple)):
+                    value = list(value)
+                _array_header(len(value), out)
+                for o in value:
+                    self._write(nested, nested_projection, rows, o, out)
+            else:
+                self._write(nested, nested_projection, rows, value, out)
+
+    def encode(self, serializer, obj):
+        """Get the MessagePack bytes for serializing ``obj``.
+
+        :param serializer: The :class:`Serializer` instance to use. Its
+            ``many`` attribute determines whether ``obj`` is a collection.
+        :param obj: The object or objects to serialize.
+        """
+        out = bytearray()
+        for chunk in self._iterencode(serializer, obj, out, None):
+            pass
+        return bytes(out)
+
+    def iterencode(self, serializer, obj):
+        """Yield the MessagePack bytes for ``obj`` in chunks.
+
+        For ``many=True`` serializers, the chunks are split on object
+        boundaries. See :meth:`encode` for the parameters.
+        """
+        chunks = self._iterencode(
+            serializer, obj, bytearray(), self.chunk_size)
+        for chunk in chunks:
+            if chunk:
+                yield bytes(chunk)
+
+    def _iterencode(self, serializer, obj, out, chunk_size):
+        # Yields ``out`` once it holds ``chunk_size`` bytes, and clears it
+        # when resumed. The caller must copy it before resuming.
+        if not _uses_compiled_fields(serializer):
+            _pack(serializer.to_representation(obj), out)
+            yield out
+            return
+
+        projection = serializer._projection
+        if not serializer.many:
+            self._write(serializer, projection, False, obj, out)
+            yield out
+            return
+
+        if not isinstance(obj, (list, tuple)):
+            obj = list(obj)
+        _array_header(len(obj), out)
+        write = self._write
+        for o in obj:
+            write(serializer, projection, False, o, out)
+            if chunk_size is not None and len(out) >= chunk_size:
+                yield out
+                del out[:]
+        yield out
+
+
+class _Unpacker(object):
+
+    def __init__(self, data):
+        if six.PY2 and not isinstance(data, bytearray):
+            # Indexing bytearrays gives integers on Python 2 too.
+            data = bytearray(data)
+        self.data = data
+        self.offset = 0
+
+    def _take(self, size):
+        start = self.offset
+        end = self.offset = start + size
+        if end > len(self.data):
+            raise ValueError('Truncated MessagePack data')
+        return self.data[start:end]
+
+    def _unpack_from(self, unpacker, size):
+        return unpacker(self._take(size))[0]
+
+    def _text(self, size):
+        return bytes(self._take(size)).decode('utf-8')
+
+    def _array(self, size):
+        unpack = self.unpack
+        return [unpack() for _ in range(size)]
+
+    def _map(self, size):
+        unpack = self.unpack
+        result = {}
+        for _ in range(size):
+            key = unpack()
+            result[key] = unpack()
+        return result
+
+    def unpack(self):
+        data = self.data
+        offset = self.offset
+        if offset >= len(data):
+            raise ValueError('Truncated MessagePack data')
+        byte = data[offset]
+        self.offset = offset + 1
+        if byte < 0x80:
+            return byte
+        if byte >= 0xe0:
+            return byte - 0x100
+        if byte < 0x90:
+            return self._map(byte & 0x0f)
+        if byte < 0xa0:
+            return self._array(byte & 0x0f)
+        if byte < 0xc0:
+            return self._text(byte & 0x1f)
+        if byte == 0xc0:
+            return None
+        if byte == 0xc2:
+            return False
+        if byte == 0xc3:
+            return True
+        entry = _UNPACKERS.get(byte)
+        if entry is None:
+            raise ValueError(
+                'Unsupported MessagePack type 0x{0:02x}'.format(byte))
+        kind, unpacker, size = entry
+        value = self._unpack_from(unpacker, size)
+        if kind is None:
+            return value
+        return kind(self, value)
+
+
+def _bin(unpacker, size):
+    return bytes(unpacker._take(size))
+
+
+_size8 = struct.Struct('>B').unpack
+_size16 = struct.Struct('>H').unpack
+_size32 = struct.Struct('>I').unpack
+
+# Maps the type byte of the formats not handled inline to a function called
+# with the size (or None for values), the struct unpacker and its size.
+_UNPACKERS = {
+    0xc4: (_bin, _size8, 1),
+    0xc5: (_bin, _size16, 2),
+    0xc6: (_bin, _size32, 4),
+    0xca: (None, struct.Struct('>f').unpack, 4),
+    0xcb: (None, struct.Struct('>d').unpack, 8),
+    0xcc: (None, _size8, 1),
+    0xcd: (None, _size16, 2),
+    0xce: (None, _size32, 4),
+    0xcf: (None, struct.Struct('>Q').unpack, 8),
+    0xd0: (None, struct.Struct('>b').unpack, 1),
+    0xd1: (None, struct.Struct('>h').unpack, 2),
+    0xd2: (None, struct.Struct('>i').unpack, 4),
+    0xd3: (None, struct.Struct('>q').unpack, 8),
+    0xd9: (_Unpacker._text, _size8, 1),
+    0xda: (_Unpacker._text, _size16, 2),
+    0xdb: (_Unpacker._text, _size32, 4),
+    0xdc: (_Unpacker._array, _size16, 2),
+    0xdd: (_Unpacker._array, _size32, 4),
+    0xde: (_Unpacker._map, _size16, 2),
+    0xdf: (_Unpacker._map, _size32, 4),
+}
+
+
+def unpackb(data):
+    """Decode the MessagePack ``data``.
+
+    Arrays are decoded as lists, strings as text and binary data as bytes.
+    Extension types aren't supported.
+
+    :param data: A bytes-like object holding exactly one encoded value.
+    :raises ValueError: If ``data`` is invalid or truncated.
+    """
+    unpacker = _Unpacker(data)
+    value = unpacker.unpack()
+    if unpacker.offset != len(unpacker.data):
+        raise ValueError('Extra data after MessagePack value')
+    return value
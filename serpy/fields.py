@@ -1,3 +1,4 @@
+import functools
 import six
 import types
 import warnings
@@ -165,6 +166,82 @@ class BoolField(Field):
     to_internal_value = staticmethod(bool)
 
 
+def _child_converter(child, method_name):
+    """Get the conversion of ``child`` to apply to each item, if any."""
+    if child is None:
+        return None
+    if method_name == 'to_representation':
+        overridden = child._is_to_representation_overridden()
+    else:
+        overridden = child._is_to_internal_value_overridden()
+    return getattr(child, method_name) if overridden else None
+
+
+def _convert_list(convert, value):
+    # Arrays like array.array and NumPy arrays are turned into lists in C,
+    # and map calls builtin converters like int without Python frames.
+    tolist = getattr(value, 'tolist', None)
+    if tolist is not None:
+        value = tolist()
+    return list(map(convert, value))
+
+
+def _convert_dict(convert, value):
+    return dict(zip(value, map(convert, value.values())))
+
+
+class ListField(Field):
+    """A :class:`Field` that converts each item of a list with ``child``.
+
+    The whole list is converted in one pass, mapping the ``to_representation``
+    (or ``to_internal_value``) of ``child`` over it. With one of the builtin
+    fields as ``child``, like :class:`IntField`, the conversion runs without
+    calling Python code per item. Arrays with a ``tolist`` method, like
+    ``array.array`` and NumPy arrays, are converted to lists first. If
+    ``child`` doesn't convert values, like the base :class:`Field`, the list
+    is passed through unchanged. Example: ::
+
+        class PostSerializer(Serializer):
+            tags = ListField(StrField())
+            scores = ListField(child=FloatField())
+
+    :param Field child: The field converting each item. Only its conversion
+        methods are used, not its ``attr`` or ``call`` options.
+    """
+    def __init__(self, child=None, **kwargs):
+        super(ListField, self).__init__(**kwargs)
+        self.child = child
+        convert = _child_converter(child, 'to_representation')
+        if convert is not None:
+            self.to_representation = functools.partial(_convert_list, convert)
+        convert = _child_converter(child, 'to_internal_value')
+        if convert is not None:
+            self.to_internal_value = functools.partial(_convert_list, convert)
+
+
+class DictField(Field):
+    """A :class:`Field` that converts each value of a dict with ``child``.
+
+    Keys are kept as is. Like :class:`ListField`, the values are converted in
+    one pass, and the dict is passed through unchanged if ``child`` doesn't
+    convert values. Example: ::
+
+        class PostSerializer(Serializer):
+            votes = DictField(IntField())
+
+    :param Field child: The field converting each value.
+    """
+    def __init__(self, child=None, **kwargs):
+        super(DictField, self).__init__(**kwargs)
+        self.child = child
+        convert = _child_converter(child, 'to_representation')
+        if convert is not None:
+            self.to_representation = functools.partial(_convert_dict, convert)
+        convert = _child_converter(child, 'to_internal_value')
+        if convert is not None:
+            self.to_internal_value = functools.partial(_convert_dict, convert)
+
+
 class MethodField(Field):
     """A :class:`Field` that calls a method on the :class:`Serializer`.
 
@@ -207,3 +284,34 @@ class MethodField(Field):
         if method_name is None:
             method_name = 'set_{0}'.format(serializer_field_name)
         return getattr(serializer_cls, method_name, None)
+
+
+class BatchMethodField(MethodField):
+    """A :class:`MethodField` whose method is called with a batch of objects.
+
+    The method receives the list of every object being serialized by the
+    serializer in the call, and returns either a sequence of results in the
+    same order, or a mapping from each object to its result (missing objects
+    get ``None``). This allows loading related data with one query instead of
+    one per object. For example: ::
+
+        class PostSerializer(Serializer):
+            likes = BatchMethodField()
+
+            def get_likes(self, posts):
+                return count_likes([post.id for post in posts])
+
+        PostSerializer(posts, many=True).representation
+
+    Batches are gathered in a first pass over the objects, before any of
+    them is serialized, including for nested serializers: a nested
+    serializer's method receives the nested objects of every parent at once.
+    Nested objects are read from their parents once in that pass and again
+    when serializing, so they should be attributes rather than generators.
+    Outside of :meth:`Serializer.to_representation` (for example with
+    ``lazy=True`` or the streaming encoders), the method is called with one
+    object at a time.
+
+    :param str method: The method on the serializer to call. Defaults to
+        ``'get_<field name>'``.
+    """
@@ -0,0 +1,56 @@
+import copy
+import itertools
+
+
+def _chunks(objs, chunksize):
+    it = iter(objs)
+    while True:
+        chunk = list(itertools.islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _serialize_chunk(serializer, chunk):
+    return serializer.to_representation(chunk)
+
+
+def serialize_parallel(serializer, objs, workers=None, chunksize=1000,
+                       executor=None):
+    """Serialize ``objs`` in a pool of worker processes.
+
+    The objects are split into chunks of ``chunksize`` objects, each chunk is
+    serialized in a worker process, and the results are put back together in
+    the original order. Only the serializer's class and its field arguments
+    are sent to the workers, where the compiled fields are rebuilt when the
+    class is imported. This means the serializer class must be importable
+    (defined at module level), and the objects must be picklable.
+
+    :param serializer: The :class:`serpy.Serializer` instance to use.
+    :param objs: The objects to serialize.
+    :param int workers: The number of worker processes. Defaults to the
+        number of CPUs.
+    :param int chunksize: The number of objects sent to a worker at a time.
+    :param executor: A ``concurrent.futures.Executor`` to use instead of
+        creating a new process pool.
+    """
+    # Send a copy of the serializer without the objects it was created with.
+    worker_serializer = copy.copy(serializer)
+    worker_serializer._initial_obj = None
+    worker_serializer._initial_data = None
+    worker_serializer._representation = None
+    worker_serializer._internal_value = None
+    worker_serializer.many = True
+    worker_serializer.lazy = False
+
+    chunks = _chunks(objs, chunksize)
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_serialize_chunk,
+                                    itertools.repeat(worker_serializer),
+                                    chunks))
+    else:
+        results = executor.map(_serialize_chunk,
+                               itertools.repeat(worker_serializer), chunks)
+    return list(itertools.chain.from_iterable(results))
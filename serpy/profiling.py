@@ -0,0 +1,71 @@
+import collections
+import time
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+#: The statistics of one field in :meth:`FieldProfile.report`.
+FieldStats = collections.namedtuple(
+    'FieldStats', ['field', 'calls', 'total', 'per_call'])
+
+
+class FieldProfile(object):
+    """Records how often each field is serialized and how long it takes.
+
+    Pass it as the ``profile`` of a :class:`serpy.Serializer` to find the
+    fields that take the most time: ::
+
+        profile = FieldProfile()
+        PostSerializer(posts, many=True, profile=profile).representation
+        print(profile.format_report())
+
+    The time of a field includes its getter, calling the value if ``call`` is
+    set, and ``to_representation``, so for a nested serializer it includes
+    the time of all of its fields. The same profile can be passed to several
+    serializers to aggregate their timings.
+
+    :param timer: The function used to get the current time.
+    """
+    def __init__(self, timer=_timer):
+        self.timer = timer
+        # Maps (serializer class, field name) to [calls, total time].
+        self._stats = {}
+
+    def record(self, key, elapsed):
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+
+    def clear(self):
+        """Forget all the recorded timings."""
+        self._stats.clear()
+
+    def report(self):
+        """Get a list of :class:`FieldStats`, the slowest fields first.
+
+        ``field`` is named like ``'PostSerializer.author'``, ``total`` is the
+        cumulative time in seconds and ``per_call`` the mean time per call.
+        """
+        report = [
+            FieldStats('{0}.{1}'.format(serializer_cls.__name__, name),
+                       calls, total, total / calls)
+            for (serializer_cls, name), (calls, total) in self._stats.items()]
+        report.sort(key=lambda stats: stats.total, reverse=True)
+        return report
+
+    def format_report(self, limit=None):
+        """Format :meth:`report` as a text table.
+
+        :param int limit: The number of fields to include. Defaults to all of
+            them.
+        """
+        report = self.report()[:limit]
+        width = max([len('field')] + [len(stats.field) for stats in report])
+        lines = ['{0:<{1}}  {2:>10}  {3:>12}  {4:>14}'.format(
+            'field', width, 'calls', 'total (s)', 'per call (us)')]
+        for stats in report:
+            lines.append('{0:<{1}}  {2:>10}  {3:>12.6f}  {4:>14.3f}'.format(
+                stats.field, width, stats.calls, stats.total,
+                stats.per_call * 1e6))
+        return '\n'.join(lines)
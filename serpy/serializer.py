@@ -1,8 +1,13 @@
+import collections
+import functools
+import keyword
 import operator
+import re
 import six
+import threading
 import warnings
 
-from serpy.fields import Field
+from serpy.fields import BatchMethodField, Field
 
 
 class SerializerBase(Field):
@@ -13,17 +18,27 @@ def _compile_read_field_to_tuple(field, name, serializer_cls):
     getter = field.as_getter(name, serializer_cls)
     if getter is None:
         getter = serializer_cls.default_getter(field.attr or name)
+    elif isinstance(field, BatchMethodField):
+        getter = _batch_getter(getter, name)
 
     # Only set a to_representation function if it has been overridden
     # for performance.
     to_representation = None
     if field._is_to_representation_overridden():
         to_representation = field.to_representation
+        if getattr(field, 'lazy', False) and getattr(field, 'many', False):
+            # Only top-level serializers are lazy: a generator in the
+            # parent's dict could only be consumed once.
+            to_representation = _list_representation(to_representation)
 
     return (name, getter, to_representation, field.call, field.required,
             field.getter_takes_serializer)
 
 
+def _list_representation(to_representation):
+    return lambda values: list(to_representation(values))
+
+
 def _compile_write_field_to_tuple(field, name, serializer_cls):
     setter = field.as_setter(name, serializer_cls)
     if setter is None:
@@ -39,6 +54,623 @@ def _compile_write_field_to_tuple(field, name, serializer_cls):
             field.setter_takes_serializer)
 
 
+def _compile_serialize_function(compiled_fields, serializer_cls, rows=False):
+    """Generate a function serializing one object with ``compiled_fields``.
+
+    The flags in the compiled field tuples never change once a serializer
+    class has been created, so instead of checking them for every field of
+    every object, emit one straight-line statement per field that leaves out
+    the branches that don't apply. The result is a function taking
+    ``(serializer, obj)`` that behaves exactly like
+    :meth:`Serializer._serialize`, or that returns a tuple of the values in
+    field order if ``rows`` is ``True``.
+    """
+    namespace = {}
+    lines = ['def serialize(self, obj):']
+    names = []
+    values = []
+    for i, (name, getter, to_repr, call, required, pass_self) in \
+            enumerate(compiled_fields):
+        getter_name = 'get_{0}'.format(i)
+        namespace[getter_name] = getter
+        if to_repr is not None:
+            to_repr_name = 'to_repr_{0}'.format(i)
+            namespace[to_repr_name] = to_repr
+
+        if pass_self:
+            value = '{0}(self, obj)'.format(getter_name)
+        else:
+            value = '{0}(obj)'.format(getter_name)
+            if not required and (call or to_repr):
+                # The value has to be checked for None before it is
+                # transformed, so it needs its own statement.
+                var = 'v{0}'.format(i)
+                lines.append('    {0} = {1}'.format(var, value))
+                lines.append('    if {0} is not None:'.format(var))
+                value = var
+                indent = '        '
+            else:
+                var = None
+            if call:
+                value = '{0}()'.format(value)
+            if to_repr is not None:
+                value = '{0}({1})'.format(to_repr_name, value)
+            if var is not None:
+                lines.append('{0}{1} = {2}'.format(indent, var, value))
+                value = var
+        names.append(name)
+        values.append(value)
+
+    if rows:
+        lines.append('    return ({0})'.format(
+            ''.join('{0}, '.format(value) for value in values)))
+    else:
+        lines.append('    return {{{0}}}'.format(', '.join(
+            '{0!r}: {1}'.format(name, value)
+            for name, value in zip(names, values))))
+    code = compile('\n'.join(lines),
+                   '<serpy {0}>'.format(serializer_cls.__name__), 'exec')
+    six.exec_(code, namespace)
+    return namespace['serialize']
+
+
+_identifier_re = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _is_identifier(name):
+    return bool(_identifier_re.match(name)) and not keyword.iskeyword(name)
+
+
+def _is_plain_class(cls):
+    """Whether instances of ``cls`` can be built without calling ``cls()``.
+
+    This is the case when the class doesn't customize instance creation or
+    attribute assignment, so ``object.__new__`` followed by setting the
+    attributes is indistinguishable from ``cls()`` followed by ``setattr``.
+    """
+    return (isinstance(cls, type) and
+            cls.__new__ is object.__new__ and
+            cls.__init__ is object.__init__ and
+            cls.__setattr__ is object.__setattr__)
+
+
+def _has_data_descriptor(cls, attr_name):
+    for klass in cls.__mro__:
+        if attr_name in klass.__dict__:
+            return hasattr(klass.__dict__[attr_name], '__set__')
+    return False
+
+
+def _intern_str(value):
+    if type(value) is str:
+        return six.moves.intern(value)
+    return value
+
+
+def _record_repr(self):
+    return '{0}({1})'.format(type(self).__name__, ', '.join(
+        '{0}={1!r}'.format(name, getattr(self, name, None))
+        for name in self._fields))
+
+
+def _make_record_class(serializer_cls):
+    """Generate a compact ``__slots__`` class to deserialize into.
+
+    It has one slot per write field, named after the attribute the field
+    sets, and no ``__init__``, so the generated deserialize function fills
+    new instances through slot assignment without calling the class. The
+    class is available as the serializer's ``_cls``, and named so that
+    its instances can be pickled if the serializer class can be.
+    """
+    attr_names = []
+    for name, setter, _, _, _, _ in serializer_cls._compiled_write_fields:
+        attr_name = getattr(setter, '_serpy_attr_name', None)
+        if attr_name is None:
+            # Custom setters usually set the attribute the field is named
+            # after.
+            field = serializer_cls._field_map[name]
+            attr_name = field.attr or name
+        if attr_name not in attr_names:
+            attr_names.append(attr_name)
+
+    record_cls = type(
+        '{0}Record'.format(serializer_cls.__name__), (object,), {
+            '__slots__': tuple(attr_names),
+            '__module__': serializer_cls.__module__,
+            '__repr__': _record_repr,
+            '_fields': tuple(attr_names),
+        })
+    qualname = getattr(serializer_cls, '__qualname__', None)
+    if qualname is not None:
+        record_cls.__qualname__ = '{0}._cls'.format(qualname)
+    return record_cls
+
+
+def _compile_deserialize_function(compiled_fields, serializer_cls):
+    """Generate a function deserializing one value with ``compiled_fields``.
+
+    Like :func:`_compile_serialize_function`, this unrolls
+    :meth:`Serializer._deserialize` into one statement per field. Fields using
+    the default setter assign the attribute directly instead of going through
+    a setter closure. If the serializer's ``_cls`` is a plain class (see
+    :func:`_is_plain_class`) and every field uses the default setter, the
+    instance is created with ``object.__new__`` and filled with a single
+    ``__dict__`` update, or with direct slot assignment if the class defines
+    the attributes as descriptors.
+
+    The plain class is looked up when the serializer class is created. If
+    ``_cls`` is changed afterwards, the generated function notices and falls
+    back to calling ``_cls()``.
+
+    String values of the fields selected by the serializer's
+    ``intern_strings`` are interned.
+    """
+    namespace = {'new': object.__new__, 'intern_str': _intern_str}
+    intern_strings = getattr(serializer_cls, 'intern_strings', False)
+    values = []
+    prelude = []
+    all_default = True
+    for i, (name, setter, to_internal, call, required, pass_self) in \
+            enumerate(compiled_fields):
+        setter_name = 'set_{0}'.format(i)
+        namespace[setter_name] = setter
+        attr_name = getattr(setter, '_serpy_attr_name', None)
+        if pass_self or attr_name is None:
+            all_default = False
+
+        if to_internal is not None:
+            to_internal_name = 'to_internal_{0}'.format(i)
+            namespace[to_internal_name] = to_internal
+
+        intern = intern_strings is True or (
+            bool(intern_strings) and name in intern_strings)
+        if pass_self or required:
+            value = 'data[{0!r}]'.format(name)
+            if to_internal is not None and not pass_self:
+                value = '{0}({1})'.format(to_internal_name, value)
+            if intern:
+                value = 'intern_str({0})'.format(value)
+        else:
+            value = 'x{0}'.format(i)
+            prelude.append('    {0} = data.get({1!r})'.format(value, name))
+            if to_internal is not None:
+                prelude.append('    if {0} is not None:'.format(value))
+                prelude.append('        {0} = {1}({0})'.format(
+                    value, to_internal_name))
+            if intern:
+                prelude.append('    {0} = intern_str({0})'.format(value))
+        values.append((name, setter_name, attr_name, pass_self, value))
+
+    def assignments(indent):
+        lines = []
+        for name, setter_name, attr_name, pass_self, value in values:
+            if pass_self:
+                line = '{0}(self, v, {1})'.format(setter_name, value)
+            elif attr_name is None:
+                line = '{0}(v, {1})'.format(setter_name, value)
+            elif _is_identifier(attr_name):
+                line = 'v.{0} = {1}'.format(attr_name, value)
+            else:
+                line = 'setattr(v, {0!r}, {1})'.format(attr_name, value)
+            lines.append(indent + line)
+        return lines
+
+    lines = ['def deserialize(self, data):']
+    lines.extend(prelude)
+    lines.append('    cls = self._cls')
+
+    plain_cls = getattr(serializer_cls, '_cls', None)
+    if all_default and _is_plain_class(plain_cls):
+        namespace['plain_cls'] = plain_cls
+        lines.append('    if cls is plain_cls:')
+        lines.append('        v = new(cls)')
+        if any(_has_data_descriptor(plain_cls, attr_name)
+               for _, _, attr_name, _, _ in values):
+            lines.extend(assignments('        '))
+        elif values:
+            lines.append('        v.__dict__.update({{{0}}})'.format(', '.join(
+                '{0!r}: {1}'.format(attr_name, value)
+                for _, _, attr_name, _, value in values)))
+        lines.append('        return v')
+
+    lines.append('    v = cls()')
+    lines.extend(assignments('    '))
+    lines.append('    return v')
+    code = compile('\n'.join(lines),
+                   '<serpy {0}>'.format(serializer_cls.__name__), 'exec')
+    six.exec_(code, namespace)
+    return namespace['deserialize']
+
+
+# Per-thread state of the serialization call in progress. ``memo`` holds the
+# nested representations reused by dedupe=True serializers, and ``profile``
+# the serpy.profiling.FieldProfile recording field timings.
+_local = threading.local()
+
+
+def _uses_compiled_fields(serializer):
+    """Whether ``serializer`` is fully described by its compiled fields.
+
+    This is true for :class:`Serializer` instances that don't customize how
+    objects are turned into dicts, so alternative ways of serializing, like
+    streaming encoders or compiled variants, can walk the compiled fields of
+    a nested serializer instead of calling its ``to_representation``.
+    """
+    if not isinstance(serializer, Serializer):
+        return False
+    cls = type(serializer)
+    return (cls._compiled_serialize is not None and
+            six.get_unbound_function(cls.to_representation) is
+            six.get_unbound_function(Serializer.to_representation))
+
+
+def _batch_results(method, serializer, objs):
+    """Call a batch method, returning its results keyed by object id.
+
+    The objects are stored along with their results, so a result is only
+    used for the exact object it was computed for.
+    """
+    results = method(serializer, objs)
+    if hasattr(results, 'keys'):
+        return dict((id(o), (o, results.get(o))) for o in objs)
+    results = list(results)
+    if len(results) != len(objs):
+        raise ValueError(
+            '{0} returned {1} results for {2} objects'.format(
+                method.__name__, len(results), len(objs)))
+    return dict((id(o), (o, r)) for o, r in zip(objs, results))
+
+
+def _batch_getter(method, name):
+    """Make the getter of a :class:`BatchMethodField`.
+
+    The getter reads the result gathered for the object by
+    :func:`_prefetch_batches` during the current call, or calls the method
+    with just that object if there is none.
+    """
+    def getter(self, obj):
+        batches = getattr(_local, 'batches', None)
+        if batches is not None:
+            results = batches.get((id(self), name))
+            if results is not None:
+                entry = results.get(id(obj))
+                if entry is not None and entry[0] is obj:
+                    return entry[1]
+        return _batch_results(method, self, [obj])[id(obj)][1]
+    getter._serpy_batch_method = method
+    return getter
+
+
+def _unique(objs):
+    seen = set()
+    unique = []
+    for o in objs:
+        if id(o) not in seen:
+            seen.add(id(o))
+            unique.append(o)
+    return unique
+
+
+def _prefetch_batches(serializer, projection, objs, batches):
+    """Gather the results of the batch fields of ``serializer`` for ``objs``.
+
+    Nested serializers with batch fields are walked too, with the nested
+    objects of every object in ``objs``, so each batch method is called once
+    per nested serializer. Results are stored in ``batches`` keyed by the
+    identity of the serializer instance and the field name.
+    """
+    if not objs:
+        return
+    cls = type(serializer)
+    for compiled_field, nested_projection in _select_read_fields(
+            cls, projection):
+        name, getter, to_repr, call, required, pass_self = compiled_field
+        method = getattr(getter, '_serpy_batch_method', None)
+        if method is not None:
+            batches.setdefault((id(serializer), name), {}).update(
+                _batch_results(method, serializer, objs))
+            continue
+
+        nested = cls._field_map[name]
+        if not (isinstance(nested, Serializer) and nested._batched):
+            continue
+        children = []
+        for o in objs:
+            value = getter(serializer, o) if pass_self else getter(o)
+            if value is None:
+                continue
+            if call:
+                value = value()
+            if nested.many:
+                children.extend(value)
+            else:
+                children.append(value)
+        _prefetch_batches(nested, nested_projection, _unique(children),
+                          batches)
+
+
+def _nested_to_representation(nested, dedupe, projection, rows, profiled):
+    """Make a ``to_representation`` for ``nested`` using a compiled variant.
+
+    With ``dedupe``, the representation of each object is stored in the memo
+    of the current dedupe=True call, keyed by the identity of the nested
+    serializer and of the object. The object is kept in the memo too, so its
+    id can't be reused by another object while the call is running.
+    """
+    fields, serialize = type(nested)._read_variant(
+        dedupe, projection, rows, profiled)
+
+    if dedupe:
+        memo_prefix = (id(nested), projection, rows)
+
+        def to_representation(value):
+            memo = _local.memo
+            key = (memo_prefix, id(value))
+            entry = memo.get(key)
+            if entry is None:
+                entry = memo[key] = (value, serialize(nested, value))
+            return entry[1]
+    else:
+        def to_representation(value):
+            return serialize(nested, value)
+
+    if not nested.many:
+        return to_representation
+    return lambda values: [to_representation(v) for v in values]
+
+
+def _caching_serialize_function(serialize, cache, variant_key):
+    """Wrap a generated serialize function to go through ``cache``.
+
+    ``variant_key`` is part of the cache key, so different serializer classes
+    (like subclasses inheriting the cache) and compiled variants producing
+    different output never share entries.
+    """
+    cache_key = cache.key
+    get = cache.get
+    set_ = cache.set
+    missing = object()
+
+    def cached_serialize(self, obj):
+        key = cache_key(obj)
+        if key is None:
+            return serialize(self, obj)
+        key = (variant_key, key)
+        result = get(key, missing)
+        if result is missing:
+            result = serialize(self, obj)
+            set_(key, result)
+        return result
+    return cached_serialize
+
+
+def _split_projection(projection, field_map, serializer_cls):
+    """Apply ``projection`` to the top level of ``field_map``.
+
+    Returns the set of field names kept, and a dict mapping field names to the
+    constraints to apply inside them.
+    """
+    keep = set(field_map)
+    children = {}
+    for only, exclude in projection:
+        only = None if only is None else dict(only)
+        exclude = {} if exclude is None else dict(exclude)
+        unknown = set(only or ()).union(exclude).difference(field_map)
+        if unknown:
+            raise ValueError('Unknown fields for {0}: {1}'.format(
+                serializer_cls.__name__, ', '.join(sorted(unknown))))
+
+        for name in field_map:
+            child_only = child_exclude = None
+            if only is not None:
+                if name not in only:
+                    keep.discard(name)
+                    continue
+                child_only = only[name]
+            if name in exclude:
+                child_exclude = exclude[name]
+                if child_exclude is None:
+                    keep.discard(name)
+                    continue
+            if child_only is not None or child_exclude is not None:
+                children.setdefault(name, []).append(
+                    (child_only, child_exclude))
+    return keep, children
+
+
+def _select_read_fields(serializer_cls, projection):
+    """Pick the compiled read fields of ``serializer_cls`` in ``projection``.
+
+    ``projection`` is ``None`` to keep every field, or a tuple of
+    ``(fields, exclude)`` constraints that must all be satisfied, as built by
+    :func:`_projection`.
+
+    Returns ``(compiled_field, nested_projection)`` pairs, where
+    ``nested_projection`` is the projection to use for a nested serializer:
+    its own ``fields``/``exclude`` plus whatever the dotted paths of
+    ``projection`` select inside it.
+    """
+    field_map = serializer_cls._field_map
+    compiled_fields = serializer_cls._compiled_read_fields
+    if projection is None:
+        return tuple(
+            (compiled_field,
+             getattr(field_map[compiled_field[0]], '_projection', None))
+            for compiled_field in compiled_fields)
+
+    keep, children = _split_projection(projection, field_map, serializer_cls)
+    selected = []
+    for compiled_field in compiled_fields:
+        name = compiled_field[0]
+        if name not in keep:
+            continue
+        nested = field_map[name]
+        nested_projection = getattr(nested, '_projection', None)
+        if name in children:
+            if not _uses_compiled_fields(nested):
+                raise ValueError(
+                    "Can't select fields inside {0}.{1}, it isn't a "
+                    "serializer".format(serializer_cls.__name__, name))
+            nested_projection = ((nested_projection or ()) +
+                                 tuple(children[name]))
+        selected.append((compiled_field, nested_projection))
+    return tuple(selected)
+
+
+def _profiled_compiled_field(compiled_field, serializer_cls):
+    """Wrap a compiled read field to time it into the current profile.
+
+    The wrapper gets and transforms the value itself, so the time spent in
+    the getter, the call and ``to_representation`` (including nested
+    serializers) is all counted for the field.
+    """
+    from serpy.encoders import _field_value
+    name = compiled_field[0]
+    key = (serializer_cls, name)
+
+    def profiled_getter(self, obj):
+        profile = _local.profile
+        start = profile.timer()
+        try:
+            return _field_value(self, obj, compiled_field)
+        finally:
+            profile.record(key, profile.timer() - start)
+    return (name, profiled_getter, None, False, True, True)
+
+
+def _compile_read_variant(serializer_cls, dedupe, projection, rows,
+                          profiled):
+    """Compile the read fields of ``serializer_cls`` for the given options.
+
+    Returns the compiled field tuples and the generated serialize function,
+    which is ``None`` if the class overrides ``_serialize``.
+    """
+    fields = []
+    for compiled_field, nested_projection in _select_read_fields(
+            serializer_cls, projection):
+        name, getter, to_repr, call, required, pass_self = compiled_field
+        nested = serializer_cls._field_map[name]
+        if _uses_compiled_fields(nested) and (
+                dedupe or profiled or (rows and not nested.rows) or
+                nested_projection != nested._projection):
+            to_repr = _nested_to_representation(
+                nested, dedupe, nested_projection, rows or nested.rows,
+                profiled)
+        compiled_field = (name, getter, to_repr, call, required, pass_self)
+        if profiled:
+            compiled_field = _profiled_compiled_field(
+                compiled_field, serializer_cls)
+        fields.append(compiled_field)
+    fields = tuple(fields)
+
+    serialize = None
+    if serializer_cls._compiled_serialize is not None:
+        serialize = _compile_serialize_function(fields, serializer_cls, rows)
+        cache = serializer_cls.representation_cache
+        if cache is not None and serializer_cls._cacheable:
+            serialize = _caching_serialize_function(
+                serialize, cache, (serializer_cls, dedupe, projection, rows,
+                                   profiled))
+    return fields, serialize
+
+
+# The maximum number of compiled variants kept per serializer class. Guards
+# against unbounded growth when projections come from API clients.
+_MAX_READ_VARIANTS = 256
+
+
+def _parse_paths(paths):
+    """Turn dotted field paths into a hashable tree.
+
+    The tree is a frozenset of ``(name, subtree)`` pairs, where ``subtree`` is
+    ``None`` if the path ends at ``name``. A path ending at a field takes
+    precedence over longer paths through it.
+    """
+    tree = {}
+    for path in paths:
+        name, _, rest = path.partition('.')
+        if not rest:
+            tree[name] = None
+        elif tree.get(name, ()) is not None:
+            tree.setdefault(name, []).append(rest)
+    return frozenset(
+        (name, None if rest is None else _parse_paths(rest))
+        for name, rest in tree.items())
+
+
+def _projection(fields, exclude):
+    """Build the projection key for ``fields`` and ``exclude``.
+
+    Returns ``None`` if every field is serialized, or a one element tuple
+    holding the ``(fields, exclude)`` trees. More constraints are added to the
+    tuple when the projection of a nested serializer field is combined with
+    the dotted paths reaching into it.
+    """
+    if fields is None and not exclude:
+        return None
+    return ((None if fields is None else _parse_paths(fields),
+             _parse_paths(exclude) if exclude else None),)
+
+
+class AccessPlan(collections.namedtuple(
+        'AccessPlan', ['many', 'attrs', 'computed'])):
+    """The attributes read from an object, from :meth:`Serializer.access_plan`.
+
+    ``attrs`` maps each attribute name read from the object to ``None``, or
+    to the :class:`AccessPlan` of the attributes read from its value. If
+    ``many`` is ``True``, the plan applies to each item of a collection.
+    ``computed`` holds the names of the fields whose values come from
+    methods or custom getters, which may read anything.
+    """
+    __slots__ = ()
+
+    def paths(self, prefix=''):
+        """Get the dotted paths of the attributes read, leaves only.
+
+        Nested objects none of whose attributes are read, e.g. with only
+        method fields, are leaves.
+        """
+        paths = []
+        for name, plan in sorted(self.attrs.items()):
+            if plan is None or not plan.attrs:
+                paths.append(prefix + name)
+            else:
+                paths.extend(plan.paths(prefix + name + '.'))
+        return paths
+
+    def collections(self, prefix=''):
+        """Get the dotted paths of the nested collections read."""
+        paths = []
+        for name, plan in sorted(self.attrs.items()):
+            if plan is not None:
+                if plan.many:
+                    paths.append(prefix + name)
+                paths.extend(plan.collections(prefix + name + '.'))
+        return paths
+
+
+def _merge_access_plans(plan, other):
+    if plan is None:
+        return other
+    if other is None:
+        return plan
+    attrs = dict(plan.attrs)
+    for name, child in other.attrs.items():
+        attrs[name] = _merge_access_plans(attrs.get(name), child)
+    computed = plan.computed + tuple(
+        name for name in other.computed if name not in plan.computed)
+    return AccessPlan(plan.many or other.many, attrs, computed)
+
+
+def _add_access_path(attrs, path, plan):
+    """Add the dotted attribute ``path`` ending with ``plan`` to ``attrs``."""
+    name, _, rest = path.partition('.')
+    if rest:
+        plan = AccessPlan(False, _add_access_path({}, rest, plan), ())
+    attrs[name] = _merge_access_plans(attrs.get(name), plan)
+    return attrs
+
+
 class SerializerMeta(type):
 
     @staticmethod
@@ -80,8 +712,44 @@ class SerializerMeta(type):
             cls._get_fields(direct_fields, real_cls)
 
         real_cls._field_map = field_map
+        # Whether the class or its nested serializers have batch fields.
+        real_cls._batched = any(
+            isinstance(field, BatchMethodField) or
+            (isinstance(field, Serializer) and field._batched)
+            for field in field_map.values())
+        # Whether the representations can be stored in representation_cache.
+        # Fields whose values are filled in after serializing, like
+        # serpy.aio.AsyncMethodField, set _serpy_cacheable to False.
+        real_cls._cacheable = all(
+            field._cacheable if isinstance(field, Serializer)
+            else getattr(field, '_serpy_cacheable', True)
+            for field in field_map.values())
         real_cls._compiled_read_fields = tuple(compiled_read_fields)
         real_cls._compiled_write_fields = tuple(compiled_write_fields)
+
+        if getattr(real_cls, 'record', False) and '_cls' not in attrs:
+            real_cls._cls = _make_record_class(real_cls)
+
+        # Subclasses that override _serialize keep using it through the
+        # generic tuple interpreter.
+        if getattr(real_cls._serialize, '_serpy_base_implementation', False):
+            serialize = _compile_serialize_function(
+                real_cls._compiled_read_fields, real_cls)
+            cache = getattr(real_cls, 'representation_cache', None)
+            if cache is not None and real_cls._cacheable:
+                serialize = _caching_serialize_function(
+                    serialize, cache, (real_cls, None))
+            real_cls._compiled_serialize = serialize
+        else:
+            real_cls._compiled_serialize = None
+        if getattr(real_cls._deserialize, '_serpy_base_implementation',
+                   False):
+            real_cls._compiled_deserialize = _compile_deserialize_function(
+                real_cls._compiled_write_fields, real_cls)
+        else:
+            real_cls._compiled_deserialize = None
+        # Compiled variants of the read fields, see Serializer._read_variant.
+        real_cls._read_variants = {}
         return real_cls
 
 
@@ -96,6 +764,8 @@ def attrsetter(attr_name):
     """
     def _attrsetter(obj, val):
         setattr(obj, attr_name, val)
+    # Lets the generated deserialize function assign the attribute directly.
+    _attrsetter._serpy_attr_name = attr_name
     return _attrsetter
 
 
@@ -120,16 +790,66 @@ class Serializer(six.with_metaclass(SerializerMeta, SerializerBase)):
     :param obj: The object or objects to serialize.
     :param bool many: If ``obj`` is a collection of objects, set ``many`` to
         ``True`` to serialize to a list.
+    :param bool lazy: If ``many`` is ``True``, serialize to a generator
+        instead of a list. Objects are then read from ``obj`` and serialized
+        one at a time as the generator is consumed, so ``obj`` can be any
+        iterable, like a database cursor. The representation of a lazy
+        serializer is not cached, as a generator can only be consumed once.
+        Nested lazy serializers give lists in the representation of their
+        parent, and are only streamed by the streaming encoders.
+    :param bool dedupe: Serialize each object reached through a nested
+        serializer only once per call, and reuse the resulting dict wherever
+        the same object (by identity) appears again. Useful when the same
+        nested objects show up many times in one call. The reused dicts are
+        shared, so they shouldn't be modified.
+    :param fields: The names of the fields to serialize. Defaults to all of
+        them. Use dotted paths like ``'author.name'`` to select fields of
+        nested serializers, including ``many=True`` ones.
+    :param exclude: The names of fields not to serialize. Dotted paths
+        exclude fields of nested serializers.
+    :param bool rows: Serialize each object to a tuple of values in field
+        order instead of a dict, including in nested serializers. Use
+        :meth:`Serializer.row_header` to get the field names.
+    :param profile: A :class:`serpy.profiling.FieldProfile` to record the
+        number of calls and time spent in each field into, including the
+        fields of nested serializers. Profiling uses separately compiled
+        fields, so serializers without a profile are not slowed down.
+
+    The getters of fields left out by ``fields`` or ``exclude`` are never
+    called. The reduced set of fields is compiled once per class and distinct
+    projection, so projecting adds no cost per object.
     """
     #: The default getter used if :meth:`Field.as_getter` returns None.
     default_getter = operator.attrgetter
     default_setter = attrsetter
+    #: A :class:`serpy.RepresentationCache` storing the representation of
+    #: each serialized object across calls. Only used if ``_serialize`` isn't
+    #: overridden, and bypassed by the streaming encoders. Not used either
+    #: if the serializer, or a nested one, has a
+    #: :class:`serpy.aio.AsyncMethodField`, as its values are only filled in
+    #: once awaited.
+    representation_cache = None
+    #: Set to ``True`` to deserialize into a class generated from the write
+    #: fields, with ``__slots__`` instead of a per-instance ``__dict__``. It
+    #: replaces ``_cls``, unless ``_cls`` is set on the same class.
+    record = False
+    #: Set to ``True`` to intern the string values of every field when
+    #: deserializing, or to a collection of field names to only intern those.
+    #: This saves memory when the same strings are repeated in many objects.
+    intern_strings = False
 
-    def __init__(self, obj=None, data=None, many=False, **kwargs):
+    def __init__(self, obj=None, data=None, many=False, lazy=False,
+                 dedupe=False, fields=None, exclude=None, rows=False,
+                 profile=None, **kwargs):
         super(Serializer, self).__init__(**kwargs)
         self._initial_obj = obj
         self._initial_data = data
         self.many = many
+        self.lazy = lazy
+        self.dedupe = dedupe
+        self._projection = _projection(fields, exclude)
+        self.rows = rows
+        self.profile = profile
         self._representation = None
         self._internal_value = None
 
@@ -148,6 +868,7 @@ class Serializer(six.with_metaclass(SerializerMeta, SerializerBase)):
             v[name] = result
 
         return v
+    _serialize._serpy_base_implementation = True
 
     def _deserialize(self, data, fields):
         v = self._cls()
@@ -163,32 +884,413 @@ class Serializer(six.with_metaclass(SerializerMeta, SerializerBase)):
                     value = to_internal(value)
                 setter(v, value)
         return v
+    _deserialize._serpy_base_implementation = True
+
+    def _iter_serialize(self, objs):
+        serialize = self._compiled_serialize
+        if serialize is None:
+            fields = self._compiled_read_fields
+            serialize = self._serialize
+            return (serialize(o, fields) for o in objs)
+        return (serialize(o) for o in objs)
+
+    @classmethod
+    def _read_variant(cls, dedupe=False, projection=None, rows=False,
+                      profiled=False):
+        """Get the compiled read fields and serialize function for options.
+
+        Variants are compiled once per class and set of options, so using
+        them adds no per-object cost.
+        """
+        key = (dedupe, projection, rows, profiled)
+        variants = cls._read_variants
+        variant = variants.get(key)
+        if variant is None:
+            variant = _compile_read_variant(
+                cls, dedupe, projection, rows, profiled)
+            if len(variants) >= _MAX_READ_VARIANTS:
+                variants.clear()
+            variants[key] = variant
+        return variant
+
+    @classmethod
+    def compile(cls, many=False, fields=None, exclude=None, rows=False):
+        """Get a function serializing objects without creating serializers.
+
+        The function is bound to the compiled fields of the class, so calling
+        it skips creating a :class:`Serializer` instance for every call.
+        :class:`MethodField` methods are called on one instance shared by
+        every call, so they shouldn't rely on per-call state. The function is
+        thread-safe.
+
+        Example: ::
+
+            serialize = FooSerializer.compile()
+            serialize(foo)
+            # {'foo': 'hello', 'bar': 5}
+            serialize_many = FooSerializer.compile(many=True)
+            serialize_many([foo, foo])
+
+        :param bool many: Return a function serializing a collection of
+            objects to a list instead.
+        :param fields: See :class:`Serializer`.
+        :param exclude: See :class:`Serializer`.
+        :param bool rows: See :class:`Serializer`.
+        """
+        instance = cls(fields=fields, exclude=exclude, rows=rows)
+        if not _uses_compiled_fields(instance) or cls._batched:
+            instance.many = many
+            return instance.to_representation
+
+        if instance._projection is None and not rows:
+            serialize = six.get_unbound_function(cls._compiled_serialize)
+        else:
+            serialize = cls._read_variant(
+                projection=instance._projection, rows=rows)[1]
+        if many:
+            def serialize_many(objs):
+                return [serialize(instance, o) for o in objs]
+            return serialize_many
+        return functools.partial(serialize, instance)
+
+    @classmethod
+    def access_plan(cls, fields=None, exclude=None):
+        """Get the tree of attributes read when serializing an object.
+
+        Only the fields selected by ``fields`` and ``exclude`` are included.
+        Use it to load exactly the data that will be serialized, like the
+        columns and relations of database rows, before serializing. Returns
+        an :class:`serpy.serializer.AccessPlan`.
+
+        Example: ::
+
+            plan = PostSerializer.access_plan(exclude=['body'])
+            plan.paths()
+            # ['author.name', 'comments.text', 'title']
+            plan.collections()
+            # ['comments']
+        """
+        return cls._access_plan(_projection(fields, exclude), False)
+
+    @classmethod
+    def _access_plan(cls, projection, many):
+        attrs = {}
+        computed = []
+        for compiled_field, nested_projection in _select_read_fields(
+                cls, projection):
+            name = compiled_field[0]
+            field = cls._field_map[name]
+            if field.as_getter(name, cls) is not None:
+                computed.append(name)
+                continue
+            plan = None
+            if isinstance(field, Serializer):
+                plan = type(field)._access_plan(nested_projection, field.many)
+            _add_access_path(attrs, field.attr or name, plan)
+        return AccessPlan(many, attrs, tuple(computed))
+
+    @classmethod
+    def row_header(cls, fields=None, exclude=None):
+        """Get the field names matching the tuples of a ``rows=True`` call.
+
+        Nested serializer fields appear as ``(name, nested_header)`` pairs.
+        Pass the same ``fields`` and ``exclude`` as to the serializer.
+
+        Example: ::
+
+            BlogSerializer.row_header()
+            # ('title', ('author', ('name', 'email')), 'body')
+        """
+        return cls._row_header(_projection(fields, exclude))
+
+    @classmethod
+    def _row_header(cls, projection):
+        header = []
+        for compiled_field, nested_projection in _select_read_fields(
+                cls, projection):
+            name = compiled_field[0]
+            nested = cls._field_map[name]
+            if _uses_compiled_fields(nested):
+                header.append(
+                    (name, type(nested)._row_header(nested_projection)))
+            else:
+                header.append(name)
+        return tuple(header)
+
+    def _projected_read_fields(self):
+        """Get the compiled read fields selected by ``fields``/``exclude``."""
+        if self._projection is None:
+            return self._compiled_read_fields
+        return self._read_variant(projection=self._projection)[0]
+
+    def _variant_serialize(self, variant):
+        fields, serialize = variant
+        if serialize is None:
+            _serialize = self._serialize
+            if self.rows:
+                names = [field[0] for field in fields]
+                return lambda obj: tuple(
+                    _serialize(obj, fields)[name] for name in names)
+            return lambda obj: _serialize(obj, fields)
+        return lambda obj: serialize(self, obj)
+
+    def _enter_call(self, memo):
+        """Set up the per-thread state used by the compiled variants."""
+        previous = (getattr(_local, 'memo', None),
+                    getattr(_local, 'profile', None))
+        if self.dedupe:
+            _local.memo = memo
+        if self.profile is not None:
+            _local.profile = self.profile
+        return previous
+
+    def _iter_with_state(self, objs, serialize):
+        memo = {}
+        for o in objs:
+            previous = self._enter_call(memo)
+            try:
+                result = serialize(o)
+            finally:
+                _local.memo, _local.profile = previous
+            yield result
+
+    def _uses_variant(self):
+        return (self._projection is not None or self.dedupe or self.rows or
+                self.profile is not None)
+
+    def _variant_representation(self, obj, lazy=False):
+        profiled = self.profile is not None
+        serialize = self._variant_serialize(self._read_variant(
+            self.dedupe, self._projection, self.rows, profiled))
+        if not (self.dedupe or profiled):
+            if not self.many:
+                return serialize(obj)
+            if lazy:
+                return (serialize(o) for o in obj)
+            return [serialize(o) for o in obj]
+
+        if lazy and self.many:
+            return self._iter_with_state(obj, serialize)
+        previous = self._enter_call({})
+        try:
+            if self.many:
+                return [serialize(o) for o in obj]
+            return serialize(obj)
+        finally:
+            _local.memo, _local.profile = previous
+
+    def _batched_representation(self, obj):
+        if self.many and not isinstance(obj, (list, tuple)):
+            obj = list(obj)
+        batches = {}
+        _prefetch_batches(self, self._projection,
+                          _unique(obj if self.many else (obj,)), batches)
+        _local.batches = batches
+        try:
+            return self._to_representation(obj)
+        finally:
+            _local.batches = None
 
     def to_representation(self, obj):
-        fields = self._compiled_read_fields
+        if self._batched and getattr(_local, 'batches', None) is None and \
+                not (self.lazy and self.many):
+            return self._batched_representation(obj)
+        return self._to_representation(obj)
+
+    def _to_representation(self, obj):
+        # Not meant to be overridden, so subclasses wrapping
+        # to_representation only run once per call.
+        if self._uses_variant():
+            return self._variant_representation(obj, self.lazy)
+        if self.lazy and self.many:
+            return self._iter_serialize(obj)
+        serialize = self._compiled_serialize
+        if serialize is None:
+            fields = self._compiled_read_fields
+            if self.many:
+                serialize = self._serialize
+                return [serialize(o, fields) for o in obj]
+            return self._serialize(obj, fields)
         if self.many:
-            serialize = self._serialize
-            return [serialize(o, fields) for o in obj]
-        return self._serialize(obj, fields)
+            return [serialize(o) for o in obj]
+        return serialize(obj)
 
     def to_internal_value(self, data):
-        fields = self._compiled_write_fields
+        deserialize = self._compiled_deserialize
+        if deserialize is None:
+            fields = self._compiled_write_fields
+            if self.many:
+                deserialize = self._deserialize
+                return [deserialize(o, fields) for o in data]
+            return self._deserialize(data, fields)
         if self.many:
-            deserialize = self._deserialize
-            return [deserialize(o, fields) for o in data]
-        return self._deserialize(data, fields)
+            return [deserialize(o) for o in data]
+        return deserialize(data)
 
     @property
     def representation(self):
         """Get the serialized data from the :class:`Serializer`.
 
-        The representation will be cached for future accesses.
+        The representation will be cached for future accesses, unless the
+        serializer is ``lazy``.
         """
+        if self.lazy and self.many:
+            return self.to_representation(self._initial_obj)
         # Cache the representation for next time .representation is called.
         if self._representation is None:
             self._representation = self.to_representation(self._initial_obj)
         return self._representation
 
+    def iter_representation(self):
+        """Iterate over the serialized objects one at a time.
+
+        Unlike :attr:`Serializer.representation`, this never builds a list,
+        so the objects passed to a ``many=True`` serializer can come from any
+        iterator and are serialized as they are consumed. If ``many`` is
+        ``False``, the single serialized object is yielded.
+        """
+        if not self.many:
+            return iter((self.to_representation(self._initial_obj),))
+        if self._uses_variant():
+            return self._variant_representation(self._initial_obj, lazy=True)
+        return self._iter_serialize(self._initial_obj)
+
+    def iter_json(self, chunk_size=65536, **kwargs):
+        """Encode the serialized data as JSON, yielding it in chunks.
+
+        The JSON text is produced directly from the compiled fields, so the
+        full representation is never built. The output is the same as
+        ``json.dumps(serializer.representation, **kwargs)``.
+
+        :param int chunk_size: The approximate size of each chunk when
+            ``many`` is ``True``.
+        :param kwargs: Passed to ``json.JSONEncoder``.
+        """
+        from serpy.encoders import JSONStreamEncoder
+        encoder = JSONStreamEncoder(chunk_size, **kwargs)
+        return encoder.iterencode(self, self._initial_obj)
+
+    def write_json(self, fp, chunk_size=65536, **kwargs):
+        """Write the serialized data as JSON to the file-like object ``fp``.
+
+        See :meth:`Serializer.iter_json` for the parameters.
+        """
+        write = fp.write
+        for chunk in self.iter_json(chunk_size, **kwargs):
+            write(chunk)
+
+    def to_msgpack(self):
+        """Encode the serialized data as MessagePack bytes.
+
+        The bytes are produced directly from the compiled fields, like
+        :meth:`Serializer.iter_json`, so the representation is never built.
+        See :class:`serpy.encoders.MessagePackEncoder`.
+        """
+        from serpy.encoders import MessagePackEncoder
+        return MessagePackEncoder().encode(self, self._initial_obj)
+
+    def write_msgpack(self, fp, chunk_size=65536):
+        """Write the serialized data as MessagePack to the file-like ``fp``.
+
+        :param int chunk_size: The approximate size of each write when
+            ``many`` is ``True``.
+        """
+        from serpy.encoders import MessagePackEncoder
+        write = fp.write
+        encoder = MessagePackEncoder(chunk_size)
+        for chunk in encoder.iterencode(self, self._initial_obj):
+            write(chunk)
+
+    def from_msgpack(self, payload):
+        """Deserialize MessagePack bytes, as encoded by :meth:`to_msgpack`.
+
+        The payload is decoded with :func:`serpy.encoders.unpackb` and passed
+        to :meth:`Serializer.to_internal_value`, so ``many`` must match the
+        payload.
+        """
+        from serpy.encoders import unpackb
+        return self.to_internal_value(unpackb(payload))
+
+    def write_csv(self, fp, objs=None, batch_size=1000, header=True,
+                  **kwargs):
+        """Write the serialized objects as CSV to the file-like object ``fp``.
+
+        Nested serializers are flattened into dotted column names. Rows are
+        built directly from the compiled fields and written ``batch_size``
+        at a time, so ``objs`` can be any iterable and memory use doesn't
+        grow with it. See :class:`serpy.encoders.CSVEncoder`.
+
+        :param fp: A text file, opened with ``newline=''``.
+        :param objs: The objects to serialize. Defaults to the objects passed
+            to the serializer.
+        :param int batch_size: The number of rows written at a time.
+        :param bool header: Whether to write the header row.
+        :param kwargs: Passed to ``csv.writer``, like ``dialect`` or
+            ``delimiter``.
+        """
+        from serpy.encoders import CSVEncoder
+        if objs is None:
+            objs = self._initial_obj
+        write = fp.write
+        encoder = CSVEncoder(batch_size, header, **kwargs)
+        for chunk in encoder.iterencode(self, objs):
+            write(chunk)
+
+    def to_columns(self, objs=None, use_numpy=None):
+        """Serialize a batch of objects to columns instead of dicts.
+
+        Returns a dict mapping each field name to the column of its values,
+        in the order of ``objs``. Numeric fields are returned as typed arrays.
+        See :func:`serpy.columnar.serialize_columns` for details.
+
+        :param objs: The objects to serialize. Defaults to the objects passed
+            to the serializer.
+        :param bool use_numpy: Whether to build NumPy arrays for numeric
+            fields. Defaults to whether NumPy is installed.
+        """
+        from serpy.columnar import serialize_columns
+        if objs is None:
+            objs = self._initial_obj
+        return serialize_columns(self, objs, use_numpy)
+
+    def write_columns(self, fp, objs=None):
+        """Write a batch of objects to a columnar binary file.
+
+        Read it back with :class:`serpy.columnar.ColumnFile`. See
+        :func:`serpy.columnar.write_columns` for the format.
+
+        :param fp: A file-like object opened in binary mode.
+        :param objs: The objects to serialize. Defaults to the objects passed
+            to the serializer.
+        """
+        from serpy.columnar import write_columns
+        if objs is None:
+            objs = self._initial_obj
+        write_columns(self, objs, fp)
+
+    def serialize_parallel(self, objs=None, workers=None, chunksize=1000,
+                           executor=None):
+        """Serialize a collection of objects using multiple processes.
+
+        Returns the same list as :attr:`Serializer.representation` would for
+        a ``many=True`` serializer. See
+        :func:`serpy.parallel.serialize_parallel` for the requirements on the
+        serializer and the objects.
+
+        :param objs: The objects to serialize. Defaults to the objects passed
+            to the serializer.
+        :param int workers: The number of worker processes. Defaults to the
+            number of CPUs.
+        :param int chunksize: The number of objects sent to a worker at a
+            time.
+        :param executor: A ``concurrent.futures.Executor`` to use instead of
+            creating a new process pool.
+        """
+        from serpy.parallel import serialize_parallel
+        if objs is None:
+            objs = self._initial_obj
+        return serialize_parallel(self, objs, workers, chunksize, executor)
+
     @property
     def data(self):
         warnings.warn(
@@ -228,3 +1330,73 @@ class DictSerializer(Serializer):
         # {'foo': 5, 'bar': 2.2}
     """
     default_getter = operator.itemgetter
+
+
+def _column_names(columns):
+    # Accepts names, or a DB-API cursor.description whose items are
+    # sequences starting with the column name.
+    return tuple(column if isinstance(column, six.string_types)
+                 else column[0] for column in columns)
+
+
+class RowSerializer(Serializer):
+    """:class:`RowSerializer` serializes the rows of database query results.
+
+    Rows are read by position with ``operator.itemgetter``, so the tuples
+    returned by a DB-API cursor can be serialized directly, without building
+    an object for each row. The position of each field is looked up once,
+    when the class is created, from the column names in :attr:`columns`.
+    When the columns are only known at runtime, use
+    :meth:`RowSerializer.for_columns` with the column names or the
+    ``description`` of the cursor. Fields are matched to columns by their
+    ``attr``, or their name.
+
+    Example: ::
+
+        class UserSerializer(RowSerializer):
+            id = IntField()
+            name = StrField(attr='username')
+
+        cursor.execute('SELECT id, email, username FROM users')
+        serializer = UserSerializer.for_columns(cursor.description)
+        serializer(cursor.fetchall(), many=True).representation
+        # [{'id': 1, 'name': 'alice'}, ...]
+
+    If :attr:`columns` isn't set, fields are read by name with
+    ``operator.itemgetter``, which works for mappings and for rows like
+    ``sqlite3.Row``.
+    """
+    #: The names of the columns of the rows, in order.
+    columns = None
+
+    @classmethod
+    def default_getter(cls, column):
+        if cls.columns is None:
+            return operator.itemgetter(column)
+        try:
+            index = cls.columns.index(column)
+        except ValueError:
+            raise ValueError('{0} has no column {1!r}'.format(
+                cls.__name__, column))
+        return operator.itemgetter(index)
+
+    @classmethod
+    def for_columns(cls, columns):
+        """Get a subclass reading rows with the given columns.
+
+        Subclasses are created once per class and distinct columns.
+
+        :param columns: The column names, or a DB-API ``cursor.description``.
+        :raises ValueError: If a field has no matching column.
+        """
+        columns = _column_names(columns)
+        subclasses = cls.__dict__.get('_column_subclasses')
+        if subclasses is None:
+            subclasses = cls._column_subclasses = {}
+        subclass = subclasses.get(columns)
+        if subclass is None:
+            subclass = type(cls)(cls.__name__, (cls,), {'columns': columns})
+            if len(subclasses) >= _MAX_READ_VARIANTS:
+                subclasses.clear()
+            subclasses[columns] = subclass
+        return subclass
@@ -0,0 +1,160 @@
+"""The tests of serpy.aio, imported by test_aio on Python 3.7+."""
+import asyncio
+import unittest
+
+from serpy.aio import AsyncMethodField, AsyncSerializer
+from serpy.cache import RepresentationCache
+from serpy.fields import BatchMethodField, IntField
+from serpy.serializer import Serializer
+from tests.obj import Obj
+
+
+class Tracker(object):
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def lookup(self, value):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return value * 10
+
+
+def make_serializers(tracker):
+    class ChildSerializer(AsyncSerializer):
+        a = IntField()
+        looked_up = AsyncMethodField()
+
+        async def get_looked_up(self, obj):
+            return await tracker.lookup(obj.a)
+
+    class ParentSerializer(AsyncSerializer):
+        b = AsyncMethodField()
+        child = ChildSerializer()
+        sync = AsyncMethodField()
+
+        async def get_b(self, obj):
+            return await tracker.lookup(obj.b)
+
+        def get_sync(self, obj):
+            return obj.b + 1
+
+    class OuterSerializer(Serializer):
+        parents = ParentSerializer(many=True)
+
+    return ChildSerializer, ParentSerializer, OuterSerializer
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestAsyncSerializer(unittest.TestCase):
+
+    def test_concurrent(self):
+        tracker = Tracker()
+        _, ParentSerializer, _ = make_serializers(tracker)
+        objs = [Obj(b=i, child=Obj(a=i + 1)) for i in range(5)]
+        serializer = ParentSerializer(objs, many=True)
+        data = run(serializer.arepresentation())
+        self.assertEqual(data[2], {'b': 20,
+                                   'child': {'a': 3, 'looked_up': 30},
+                                   'sync': 3})
+        self.assertEqual(tracker.max_running, 10)
+        self.assertTrue(run(serializer.arepresentation()) is data)
+
+    def test_limit(self):
+        tracker = Tracker()
+        _, ParentSerializer, _ = make_serializers(tracker)
+        objs = [Obj(b=i, child=Obj(a=i)) for i in range(5)]
+        data = run(ParentSerializer(objs, many=True).arepresentation(limit=3))
+        self.assertEqual([d['b'] for d in data], [0, 10, 20, 30, 40])
+        self.assertEqual(tracker.max_running, 3)
+
+    def test_nested_in_sync_serializer(self):
+        tracker = Tracker()
+        ChildSerializer, _, OuterSerializer = make_serializers(tracker)
+
+        class TopSerializer(AsyncSerializer):
+            outer = OuterSerializer()
+
+        obj = Obj(outer=Obj(parents=[Obj(b=1, child=Obj(a=2))]))
+        data = run(TopSerializer(obj).arepresentation())
+        self.assertEqual(data['outer']['parents'][0]['child']['looked_up'],
+                         20)
+
+    def test_batch_method_field(self):
+        tracker = Tracker()
+
+        class ASerializer(AsyncSerializer):
+            a = IntField()
+            b = AsyncMethodField()
+            c = BatchMethodField()
+
+            async def get_b(self, obj):
+                return await tracker.lookup(obj.a)
+
+            def get_c(self, objs):
+                return [len(objs)] * len(objs)
+
+        objs = [Obj(a=1), Obj(a=2)]
+        data = run(ASerializer(objs, many=True).arepresentation())
+        self.assertEqual(data, [{'a': 1, 'b': 10, 'c': 2},
+                                {'a': 2, 'b': 20, 'c': 2}])
+
+    def test_representation_cache_skipped(self):
+        tracker = Tracker()
+        cache = RepresentationCache(key=lambda obj: obj.a)
+
+        class ASerializer(AsyncSerializer):
+            representation_cache = cache
+            a = IntField()
+            b = AsyncMethodField()
+
+            async def get_b(self, obj):
+                return await tracker.lookup(obj.a)
+
+        class BSerializer(Serializer):
+            representation_cache = cache
+            child = ASerializer()
+
+        obj = Obj(a=1)
+        data = run(ASerializer([obj, obj], many=True).arepresentation())
+        self.assertEqual(data, [{'a': 1, 'b': 10}] * 2)
+        data = run(ASerializer([obj], many=True,
+                               fields=['b']).arepresentation())
+        self.assertEqual(data, [{'b': 10}])
+        self.assertEqual(len(cache), 0)
+        self.assertFalse(BSerializer._cacheable)
+
+    def test_projection(self):
+        tracker = Tracker()
+
+        class ASerializer(AsyncSerializer):
+            a = IntField()
+            b = AsyncMethodField()
+
+            async def get_b(self, obj):
+                return await tracker.lookup(obj.a)
+
+        objs = [Obj(a=1), Obj(a=2)]
+        data = run(ASerializer(objs, many=True,
+                               fields=['a']).arepresentation())
+        self.assertEqual(data, [{'a': 1}, {'a': 2}])
+        data = run(ASerializer(objs, many=True,
+                               exclude=['a']).arepresentation())
+        self.assertEqual(data, [{'b': 10}, {'b': 20}])
+
+    def test_rows_not_supported(self):
+        class ASerializer(AsyncSerializer):
+            a = IntField()
+            b = AsyncMethodField()
+
+            async def get_b(self, obj):
+                return obj.a
+
+        with self.assertRaises(ValueError):
+            run(ASerializer([Obj(a=1)], many=True,
+                            rows=True).arepresentation())
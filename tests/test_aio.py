@@ -0,0 +1,17 @@
+import sys
+import unittest
+
+# serpy.aio requires Python 3.7+, and its tests use async syntax, so they
+# are only imported on interpreters that can parse them.
+if sys.version_info >= (3, 7):
+    from tests.aio_cases import TestAsyncSerializer  # noqa: F401
+else:
+    class TestAsyncSerializer(unittest.TestCase):
+
+        @unittest.skip('serpy.aio requires Python 3.7+')
+        def test_aio(self):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
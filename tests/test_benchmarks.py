@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from six import StringIO
+
+from serpy.benchmarks import runner, schemas
+from serpy.benchmarks.__main__ import main
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_schemas(self):
+        serializer_cls = schemas.make_serializer(7, depth=2, fanout=2)
+        objs = schemas.make_objects(2, 7, depth=2, fanout=2)
+        data = serializer_cls(objs, many=True).representation
+        self.assertEqual(len(data[0]), 9)
+        self.assertEqual(len(data[1]['children']), 2)
+        self.assertEqual(data[1]['f5'], 7)
+        self.assertEqual(schemas.count_nodes(2, 2), 13)
+
+    def test_deserialize(self):
+        scenario = runner.Scenario('test', 7, 1, 2, 3)
+        objs = runner.deserialize_benchmark(scenario)()
+        self.assertEqual(len(objs), 3)
+        self.assertIsInstance(objs[0], schemas.Obj)
+        self.assertEqual(objs[1].f5, 6)
+        self.assertEqual(objs[1].children[1].f0, 2)
+        serializer_cls = schemas.make_serializer(7, 1, 2)
+        self.assertEqual(
+            serializer_cls(objs, many=True).representation,
+            runner.serialize_benchmark(scenario)())
+
+    @unittest.skipIf(runner.tracemalloc is None, 'requires tracemalloc')
+    def test_measure_memory(self):
+        stats = runner.measure_memory(lambda: [object() for _ in range(100)])
+        self.assertGreaterEqual(stats['retained_blocks'], 100)
+        self.assertGreaterEqual(stats['peak'], stats['retained'])
+        self.assertGreater(stats['retained'], 0)
+
+    def test_summarize(self):
+        stats = runner.summarize([3, 1, 2, 4])
+        self.assertEqual((stats['min'], stats['max'], stats['median']),
+                         (1, 4, 2.5))
+        self.assertEqual(stats['mean'], 2.5)
+
+    def test_compare(self):
+        def results(per_object):
+            return {'benchmarks': dict(
+                (name, {'per_object': value})
+                for name, value in per_object.items())}
+
+        comparisons = runner.compare(
+            results({'a': 1.2, 'b': 1.0, 'c': 5}),
+            results({'a': 1.0, 'b': 1.0}), threshold=0.1)
+        comparisons = dict((c.name, c) for c in comparisons)
+        self.assertEqual(sorted(comparisons), ['a', 'b'])
+        self.assertTrue(comparisons['a'].regression)
+        self.assertFalse(comparisons['b'].regression)
+
+        current = results({})
+        current['memory'] = {'a': {'peak_per_object': 300}}
+        baseline = results({})
+        baseline['memory'] = {'a': {'peak_per_object': 200}}
+        comparison, = runner.compare(current, baseline)
+        self.assertEqual(comparison.name, 'memory:a')
+        self.assertTrue(comparison.regression)
+
+    def test_main(self):
+        output = os.path.join(self.tmpdir, 'results.json')
+        args = ['--width', '2', '--depth', '1', '--objects', '5', '-r', '2',
+                '-w', '0']
+        out = StringIO()
+        self.assertEqual(main(args + ['-o', output], out=out), 0)
+        self.assertIn('serialize/custom', out.getvalue())
+        self.assertIn('deserialize/custom', out.getvalue())
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(results['benchmarks']['serialize/custom']['objects'],
+                         15)
+        self.assertEqual(results['memory'], {})
+
+        # Make the baseline much faster than anything can be.
+        for stats in results['benchmarks'].values():
+            stats['per_object'] = 1e-15
+        runner.save(results, output)
+        out = StringIO()
+        self.assertEqual(main(args + ['--baseline', output], out=out), 1)
+        self.assertIn('REGRESSION', out.getvalue())
+
+    @unittest.skipIf(runner.tracemalloc is None, 'requires tracemalloc')
+    def test_main_memory(self):
+        out = StringIO()
+        args = ['-b', 'deserialize', '--width', '2', '--objects', '5', '-r',
+                '1', '-w', '0', '--memory']
+        self.assertEqual(main(args, out=out), 0)
+        self.assertIn('bytes/object peak', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from serpy.cache import RepresentationCache
+from serpy.fields import Field, MethodField
+from serpy.serializer import Serializer
+from tests.obj import Obj
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRepresentationCache(unittest.TestCase):
+
+    def test_lru(self):
+        cache = RepresentationCache(key=None, maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 1, 'size': 2,
+                                         'maxsize': 2})
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = RepresentationCache(key=None, ttl=10, timer=timer)
+        cache.set('a', 1)
+        timer.now = 9
+        self.assertEqual(cache.get('a'), 1)
+        timer.now = 10
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_serializer_cache(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            representation_cache = RepresentationCache(
+                key=lambda o: (o.pk, o.version) if o.pk else None)
+
+            pk = Field()
+            value = MethodField()
+
+            def get_value(self, obj):
+                calls.append(obj.pk)
+                return obj.value
+
+        class BSerializer(Serializer):
+            a = ASerializer()
+            many_a = ASerializer(many=True)
+
+        class CSerializer(ASerializer):
+            extra = Field(attr='value')
+
+        o1 = Obj(pk=1, version=1, value='x')
+        o2 = Obj(pk=2, version=1, value='y')
+        ASerializer([o1, o2], many=True).representation
+        data = BSerializer(Obj(a=o1, many_a=[o2, o1])).representation
+        self.assertEqual(data, {'a': {'pk': 1, 'value': 'x'},
+                                'many_a': [{'pk': 2, 'value': 'y'},
+                                           {'pk': 1, 'value': 'x'}]})
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(ASerializer.representation_cache.hits, 3)
+
+        o1.version = 2
+        o1.value = 'z'
+        self.assertEqual(ASerializer(o1).representation['value'], 'z')
+        self.assertEqual(calls, [1, 2, 1])
+
+        # Subclasses share the cache without sharing entries.
+        self.assertEqual(CSerializer(o1).representation,
+                         {'pk': 1, 'value': 'z', 'extra': 'z'})
+
+        # Objects without a key aren't cached.
+        o3 = Obj(pk=None, version=1, value='w')
+        ASerializer(o3).representation
+        ASerializer(o3).representation
+        self.assertEqual(calls, [1, 2, 1, 1, None, None])
+
+        # Dedupe variants go through the cache too.
+        del calls[:]
+        BSerializer(Obj(a=o1, many_a=[o2]), dedupe=True).representation
+        BSerializer(Obj(a=o1, many_a=[o2]), dedupe=True).representation
+        self.assertEqual(calls, [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
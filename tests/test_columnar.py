@@ -0,0 +1,163 @@
+import array
+import os
+import shutil
+import tempfile
+import unittest
+
+from serpy.columnar import ColumnFile, numpy
+from serpy.fields import (
+    Field, BoolField, FloatField, IntField, MethodField, StrField)
+from serpy.serializer import Serializer
+from tests.obj import Obj
+
+
+class ASerializer(Serializer):
+    a = IntField()
+    b = FloatField(call=True)
+    c = BoolField()
+    d = StrField()
+    e = IntField(required=False)
+    f = MethodField()
+    g = Field()
+
+    def get_f(self, obj):
+        return obj.a * 2
+
+
+def make_objs(n):
+    return [Obj(a=str(i), b=lambda: i / 2.0, c=i % 2, d=i,
+                e=None if i == 1 else i, g=[i]) for i in range(n)]
+
+
+class TestColumnar(unittest.TestCase):
+
+    def assertColumnsMatch(self, columns, objs):
+        rows = ASerializer(objs, many=True).representation
+        self.assertEqual(set(columns), set(rows[0]))
+        for name, column in columns.items():
+            self.assertEqual(list(column), [row[name] for row in rows])
+
+    def test_array_columns(self):
+        objs = make_objs(4)
+        columns = ASerializer().to_columns(objs, use_numpy=False)
+        self.assertColumnsMatch(columns, objs)
+        self.assertTrue(isinstance(columns['a'], array.array))
+        self.assertEqual(columns['b'].typecode, 'd')
+        self.assertEqual(columns['c'].typecode, 'b')
+        self.assertTrue(isinstance(columns['d'], list))
+        # Optional numeric fields with None values stay lists.
+        self.assertEqual(columns['e'], [0, None, 2, 3])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy_columns(self):
+        objs = make_objs(4)
+        columns = ASerializer().to_columns(objs, use_numpy=True)
+        self.assertColumnsMatch(columns, objs)
+        self.assertEqual(columns['a'].dtype, numpy.int64)
+        self.assertEqual(columns['c'].dtype, numpy.bool_)
+
+    @unittest.skipIf(numpy is not None, 'NumPy is installed')
+    def test_numpy_missing(self):
+        self.assertRaises(ImportError,
+                          lambda: ASerializer().to_columns([], use_numpy=True))
+
+    def test_initial_obj_and_iterators(self):
+        objs = make_objs(3)
+        columns = ASerializer(iter(objs), many=True).to_columns(
+            use_numpy=False)
+        self.assertColumnsMatch(columns, objs)
+
+    def test_overflow(self):
+        class BSerializer(Serializer):
+            a = IntField()
+
+        columns = BSerializer().to_columns([Obj(a=2 ** 70)], use_numpy=False)
+        self.assertEqual(columns['a'], [2 ** 70])
+
+
+class TestColumnFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'columns.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, serializer, objs=None):
+        with open(self.path, 'wb') as f:
+            serializer.write_columns(f, objs)
+
+    def test_round_trip(self):
+        objs = make_objs(5)
+        objs[2].d = u'caf\xe9'
+        self.write(ASerializer(objs, many=True))
+        rows = ASerializer(objs, many=True).representation
+        with ColumnFile(self.path, use_numpy=False) as columns:
+            self.assertEqual(len(columns), 5)
+            self.assertEqual(columns.names, list(ASerializer._field_map))
+            self.assertEqual(list(columns.column('a')), [0, 1, 2, 3, 4])
+            self.assertEqual(columns.column('b')[-1], 2.0)
+            self.assertEqual(list(columns.column('c')),
+                             [False, True, False, True, False])
+            self.assertEqual(columns.column('d')[1:3], [u'1', u'caf\xe9'])
+            self.assertEqual(columns.column('e').format, 'q')
+            self.assertEqual(list(columns.validity('e')),
+                             [True, False, True, True, True])
+            self.assertEqual(columns.validity('a'), None)
+            self.assertEqual(columns.row(1)['e'], None)
+            self.assertEqual(columns.column('g')[4], [4])
+            self.assertEqual(list(columns.iter_rows()), rows)
+            self.assertEqual(columns.row(3, names=['a', 'f']),
+                             {'a': 3, 'f': '33'})
+            self.assertRaises(IndexError, lambda: columns.column('d')[5])
+
+    def test_zero_copy(self):
+        self.write(ASerializer(), make_objs(3))
+        columns = ColumnFile(self.path, use_numpy=False)
+        column = columns.column('b')
+        self.assertTrue(isinstance(column, memoryview))
+        self.assertEqual(column.format, 'd')
+        self.assertTrue(column.readonly)
+        del column
+        columns.close()
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        self.write(ASerializer(), make_objs(3))
+        with ColumnFile(self.path, use_numpy=True) as columns:
+            self.assertEqual(columns.column('a').dtype, numpy.int64)
+            self.assertEqual(columns.row(1)['b'], 0.5)
+
+    def test_nullable_numeric(self):
+        class BSerializer(Serializer):
+            a = IntField(required=False)
+            b = FloatField(required=False)
+            c = StrField(required=False)
+
+        objs = [Obj(a=None, b=None, c=None), Obj(a=2, b=None, c=u'x')]
+        self.write(BSerializer(objs, many=True))
+        with ColumnFile(self.path, use_numpy=False) as columns:
+            self.assertEqual(list(columns.column('a')), [0, 2])
+            self.assertEqual(columns.column('b').format, 'd')
+            self.assertEqual(list(columns.validity('b')), [False, False])
+            self.assertEqual(columns.validity('c'), None)
+            self.assertEqual(list(columns.iter_rows()), [
+                {'a': None, 'b': None, 'c': None},
+                {'a': 2, 'b': None, 'c': u'x'}])
+
+    def test_projection_and_empty(self):
+        self.write(ASerializer([], many=True, fields=['a', 'd']))
+        with ColumnFile(self.path, use_numpy=False) as columns:
+            self.assertEqual(columns.names, ['a', 'd'])
+            self.assertEqual(list(columns.column('a')), [])
+            self.assertEqual(list(columns.iter_rows()), [])
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a column file')
+        self.assertRaises(ValueError, ColumnFile, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
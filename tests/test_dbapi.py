@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import unittest
+
+from six import StringIO
+
+from serpy.dbapi import cursor_serializer, iter_cursor, serialize_cursor
+from serpy.fields import Field, IntField, MethodField
+from serpy.serializer import DictSerializer, RowSerializer
+
+
+class UserSerializer(RowSerializer):
+    id = IntField()
+    name = Field(attr='username')
+    admin = MethodField()
+
+    def get_admin(self, row):
+        return row[self.columns.index('id')] == 1
+
+
+class CountingCursor(object):
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = cursor.description
+        self.fetches = []
+
+    def fetchmany(self, size):
+        rows = self.cursor.fetchmany(size)
+        self.fetches.append(len(rows))
+        return rows
+
+
+class TestDBAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        self.db.execute(
+            'CREATE TABLE users (id INTEGER, email TEXT, username TEXT)')
+        self.db.executemany(
+            'INSERT INTO users VALUES (?, ?, ?)',
+            [(i, 'u{0}@example.com'.format(i), 'u{0}'.format(i))
+             for i in range(1, 8)])
+
+    def tearDown(self):
+        self.db.close()
+
+    def query(self):
+        return self.db.execute(
+            'SELECT username, email, id FROM users ORDER BY id')
+
+    def test_iter_cursor(self):
+        cursor = CountingCursor(self.query())
+        self.assertEqual(len(list(iter_cursor(cursor, batch_size=3))), 7)
+        self.assertEqual(cursor.fetches, [3, 3, 1, 0])
+
+    def test_serialize_cursor(self):
+        cursor = CountingCursor(self.query())
+        batches = list(serialize_cursor(cursor, UserSerializer, batch_size=3))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual(batches[0][0],
+                         {'id': 1, 'name': 'u1', 'admin': True})
+        self.assertEqual(batches[0][1],
+                         {'id': 2, 'name': 'u2', 'admin': False})
+        self.assertEqual(cursor.fetches, [3, 3, 1, 0])
+
+        batches = serialize_cursor(self.query(), UserSerializer, rows=True,
+                                   fields=['name'])
+        self.assertEqual(next(batches)[-1], ('u7',))
+
+    def test_row_factory(self):
+        class ASerializer(DictSerializer):
+            id = IntField()
+
+        self.db.row_factory = sqlite3.Row
+        batches = list(serialize_cursor(self.query(), ASerializer))
+        self.assertEqual(batches, [[{'id': i} for i in range(1, 8)]])
+
+    def test_cursor_serializer(self):
+        cursor = CountingCursor(self.query())
+        fp = StringIO()
+        cursor_serializer(cursor, UserSerializer, batch_size=2,
+                          fields=['id']).write_json(fp, chunk_size=10)
+        self.assertEqual(json.loads(fp.getvalue()),
+                         [{'id': i} for i in range(1, 8)])
+        self.assertEqual(cursor.fetches, [2, 2, 2, 1, 0])
+
+    def test_no_result_set(self):
+        cursor = self.db.cursor()
+        self.assertRaises(ValueError, lambda: list(
+            serialize_cursor(cursor, UserSerializer)))
+
+
+if __name__ == '__main__':
+    unittest.main()
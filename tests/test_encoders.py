@@ -0,0 +1,233 @@
+import csv
+import json
+import unittest
+
+from six import BytesIO, StringIO
+
+from serpy.encoders import packb, unpackb
+from serpy.fields import Field, MethodField, IntField, StrField
+from serpy.serializer import Serializer, DictSerializer
+from tests.obj import Obj
+
+
+class ASerializer(Serializer):
+    a = IntField()
+    b = StrField(required=False)
+
+
+class BSerializer(Serializer):
+    x = Field(call=True)
+    a = ASerializer()
+    many_a = ASerializer(many=True, attr='as_')
+    maybe_a = ASerializer(required=False)
+    plus = MethodField()
+
+    def get_plus(self, obj):
+        return obj.a.a + 1
+
+
+def make_b(i):
+    return Obj(x=lambda: i, a=Obj(a=i, b=None),
+               as_=[Obj(a=j, b='s') for j in range(i)],
+               maybe_a=None)
+
+
+class TestJSONStream(unittest.TestCase):
+
+    def test_single(self):
+        s = BSerializer(make_b(3))
+        text = ''.join(s.iter_json())
+        self.assertEqual(json.loads(text), s.representation)
+        self.assertEqual(text, json.dumps(s.representation))
+
+    def test_many_chunks(self):
+        objs = [make_b(i) for i in range(20)]
+        s = BSerializer(objs, many=True)
+        chunks = list(s.iter_json(chunk_size=100))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(''.join(chunks), json.dumps(s.representation))
+
+    def test_empty_many(self):
+        self.assertEqual(''.join(ASerializer([], many=True).iter_json()), '[]')
+
+    def test_kwargs(self):
+        s = BSerializer(make_b(2))
+        kwargs = {'sort_keys': True, 'separators': (',', ':')}
+        self.assertEqual(''.join(s.iter_json(**kwargs)),
+                         json.dumps(s.representation, **kwargs))
+        self.assertRaises(ValueError, lambda: list(s.iter_json(indent=2)))
+
+    def test_projection(self):
+        class CSerializer(Serializer):
+            a = ASerializer(fields=['a'])
+            b = IntField()
+
+        s = CSerializer([Obj(a=Obj(a=1, b='x'), b=2)], many=True,
+                        exclude=['b'])
+        self.assertEqual(''.join(s.iter_json()), '[{"a": {"a": 1}}]')
+
+    def test_nested_projection(self):
+        s = BSerializer([make_b(2)], many=True,
+                        fields=['many_a.a', 'a.b', 'x'])
+        self.assertEqual(''.join(s.iter_json()), json.dumps(s.representation))
+        self.assertEqual(json.loads(''.join(s.iter_json())), [
+            {'x': 2, 'a': {'b': None}, 'many_a': [{'a': 0}, {'a': 1}]}])
+
+    def test_rows(self):
+        s = BSerializer([make_b(2)], many=True, rows=True)
+        self.assertEqual(json.loads(''.join(s.iter_json(sort_keys=True))),
+                         json.loads(json.dumps(s.representation)))
+        s = BSerializer(make_b(1), fields=['many_a.b'], rows=True)
+        self.assertEqual(''.join(s.iter_json()), '[[["s"]]]')
+
+    def test_write_json(self):
+        fp = StringIO()
+        ASerializer([Obj(a='1', b=2)], many=True).write_json(fp)
+        self.assertEqual(json.loads(fp.getvalue()), [{'a': 1, 'b': '2'}])
+
+    def test_custom_to_representation(self):
+        class CSerializer(DictSerializer):
+            a = Field()
+
+            def to_representation(self, obj):
+                v = super(CSerializer, self).to_representation(obj)
+                v['extra'] = 1
+                return v
+
+        class DSerializer(Serializer):
+            c = CSerializer()
+
+        s = DSerializer(Obj(c={'a': 5}))
+        self.assertEqual(json.loads(''.join(s.iter_json())),
+                         {'c': {'a': 5, 'extra': 1}})
+        s = CSerializer({'a': 5})
+        self.assertEqual(json.loads(''.join(s.iter_json())),
+                         {'a': 5, 'extra': 1})
+
+
+class TestCSV(unittest.TestCase):
+
+    def read(self, serializer, objs=None, **kwargs):
+        fp = StringIO()
+        serializer.write_csv(fp, objs, **kwargs)
+        return list(csv.reader(StringIO(fp.getvalue()),
+                               delimiter=kwargs.get('delimiter', ',')))
+
+    def test_flattened(self):
+        rows = self.read(BSerializer(), [make_b(2), make_b(0)])
+        self.assertEqual(rows[0], ['x', 'a.a', 'a.b', 'many_a', 'maybe_a.a',
+                                   'maybe_a.b', 'plus'])
+        self.assertEqual(rows[1], [
+            '2', '2', '', '[{"a": 0, "b": "s"}, {"a": 1, "b": "s"}]', '',
+            '', '3'])
+        self.assertEqual(rows[2], ['0', '0', '', '[]', '', '', '1'])
+
+    def test_nested_many_projection(self):
+        s = BSerializer([make_b(2)], many=True, fields=['x', 'many_a.a'])
+        rows = self.read(s)
+        self.assertEqual(rows, [['x', 'many_a'],
+                                ['2', '[{"a": 0}, {"a": 1}]']])
+        self.assertEqual(json.loads(rows[1][1]), s.representation[0]['many_a'])
+
+    def test_batches(self):
+        objs = (Obj(a=i, b='s\t{0}'.format(i)) for i in range(25))
+        fp = StringIO()
+        ASerializer(objs, many=True, fields=['b']).write_csv(
+            fp, batch_size=10, header=False, delimiter='\t')
+        rows = list(csv.reader(StringIO(fp.getvalue()), delimiter='\t'))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[24], ['s\t24'])
+
+    def test_custom_to_representation(self):
+        class CSerializer(Serializer):
+            a = Field()
+
+            def to_representation(self, obj):
+                result = super(CSerializer, self).to_representation(obj)
+                for v in result:
+                    v['a'] *= 2
+                return result
+
+        rows = self.read(CSerializer(), [Obj(a=1), Obj(a=[2])],
+                         batch_size=1)
+        self.assertEqual(rows, [['a'], ['2'], ['[2, 2]']])
+
+
+class TestMessagePack(unittest.TestCase):
+
+    def test_packb(self):
+        self.assertEqual(packb(None), b'\xc0')
+        self.assertEqual(packb([True, False]), b'\x92\xc3\xc2')
+        self.assertEqual(packb({'a': 1}), b'\x81\xa1a\x01')
+        self.assertEqual(packb(-33), b'\xd0\xdf')
+        self.assertEqual(packb(2 ** 32), b'\xcf\x00\x00\x00\x01' + 4 * b'\x00')
+        self.assertEqual(packb(1.5), b'\xcb\x3f\xf8' + 6 * b'\x00')
+        self.assertEqual(packb(u'x' * 40)[:2], b'\xd9\x28')
+        self.assertRaises(TypeError, packb, object())
+        self.assertRaises(OverflowError, packb, 2 ** 64)
+
+    def test_round_trip(self):
+        values = [
+            None, True, 0, 127, 128, 65536, 2 ** 64 - 1, -1, -32, -129,
+            -2 ** 63, 0.25, u'', u'caf\xe9' * 100, u'x' * 70000,
+            list(range(20)), dict((str(i), i) for i in range(20)),
+            {'nested': [{'a': None}, []]},
+        ]
+        for value in values:
+            self.assertEqual(unpackb(packb(value)), value)
+        self.assertEqual(unpackb(bytearray(packb((1, 2)))), [1, 2])
+
+    def test_unpackb_errors(self):
+        self.assertRaises(ValueError, unpackb, b'')
+        self.assertRaises(ValueError, unpackb, b'\x92\x01')
+        self.assertRaises(ValueError, unpackb, b'\x01\x01')
+        self.assertRaises(ValueError, unpackb, b'\xd4\x01\x01')
+
+    def test_serializer(self):
+        s = BSerializer(make_b(3))
+        self.assertEqual(unpackb(s.to_msgpack()), s.representation)
+        self.assertEqual(s.to_msgpack(), packb(s.representation))
+
+        objs = [make_b(i) for i in range(20)]
+        s = BSerializer(objs, many=True)
+        self.assertEqual(unpackb(s.to_msgpack()), s.representation)
+        fp = BytesIO()
+        s.write_msgpack(fp, chunk_size=100)
+        self.assertEqual(fp.getvalue(), s.to_msgpack())
+
+    def test_projection_and_rows(self):
+        s = BSerializer([make_b(2)], many=True, fields=['many_a.a', 'x'])
+        self.assertEqual(unpackb(s.to_msgpack()),
+                         [{'x': 2, 'many_a': [{'a': 0}, {'a': 1}]}])
+        s = BSerializer(make_b(1), fields=['many_a.b', 'plus'], rows=True)
+        self.assertEqual(unpackb(s.to_msgpack()), [[['s']], 2])
+
+    def test_custom_to_representation(self):
+        class CSerializer(Serializer):
+            a = Field()
+
+            def to_representation(self, obj):
+                return {'wrapped': obj.a}
+
+        s = CSerializer(Obj(a=5))
+        self.assertEqual(unpackb(s.to_msgpack()), {'wrapped': 5})
+
+    def test_from_msgpack(self):
+        class CSerializer(Serializer):
+            _cls = Obj
+            a = IntField()
+            b = StrField(required=False)
+
+        class DSerializer(Serializer):
+            _cls = Obj
+            a = IntField()
+            many_a = CSerializer(many=True)
+
+        payload = packb([{'a': '1', 'many_a': [{'a': 2, 'b': 'x'}]}])
+        objs = DSerializer(many=True).from_msgpack(payload)
+        self.assertEqual(objs[0].a, 1)
+        self.assertEqual(objs[0].many_a[0].b, 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
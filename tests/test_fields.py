@@ -1,8 +1,10 @@
+import array
 import unittest
 import warnings
 
 from serpy.fields import (
-    Field, MethodField, BoolField, IntField, FloatField, StrField)
+    Field, MethodField, BoolField, IntField, FloatField, StrField, ListField,
+    DictField)
 from tests.obj import Obj
 
 
@@ -80,6 +82,28 @@ class TestFields(unittest.TestCase):
         self.assertEqual(field.to_internal_value(5.2), 5.2)
         self.assertEqual(field.to_internal_value('5.5'), 5.5)
 
+    def test_list_field(self):
+        field = ListField(IntField())
+        self.assertEqual(field.to_representation(['1', 2.5, 3]), [1, 2, 3])
+        self.assertEqual(field.to_internal_value(('4',)), [4])
+        self.assertTrue(field._is_to_representation_overridden())
+        self.assertEqual(
+            ListField(child=FloatField()).to_representation(
+                array.array('i', [1, 2])), [1.0, 2.0])
+
+        # A child that doesn't convert leaves the list untouched.
+        field = ListField(Field())
+        self.assertFalse(field._is_to_representation_overridden())
+        self.assertFalse(field._is_to_internal_value_overridden())
+        self.assertFalse(ListField()._is_to_representation_overridden())
+
+    def test_dict_field(self):
+        field = DictField(StrField())
+        self.assertEqual(field.to_representation({'a': 1, 2: None}),
+                         {'a': '1', 2: 'None'})
+        self.assertEqual(field.to_internal_value({'b': 2}), {'b': '2'})
+        self.assertFalse(DictField(Field())._is_to_representation_overridden())
+
     def test_method_field(self):
         class FakeSerializer(object):
             def get_a(self, obj):
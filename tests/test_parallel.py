@@ -0,0 +1,61 @@
+import unittest
+
+from serpy.fields import IntField, MethodField, StrField
+from serpy.serializer import Serializer
+from tests.obj import Obj
+
+
+class ChildSerializer(Serializer):
+    name = StrField()
+
+
+class ParentSerializer(Serializer):
+    a = IntField()
+    double = MethodField()
+    children = ChildSerializer(many=True)
+
+    def get_double(self, obj):
+        return obj.a * 2
+
+
+class DummyExecutor(object):
+    def __init__(self):
+        self.calls = 0
+
+    def map(self, fn, *iterables):
+        for args in zip(*iterables):
+            self.calls += 1
+            yield fn(*args)
+
+
+def make_objs(n):
+    return [Obj(a=i, children=[Obj(name=j) for j in range(i % 3)])
+            for i in range(n)]
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_process_pool(self):
+        objs = make_objs(50)
+        expected = ParentSerializer(objs, many=True).representation
+        data = ParentSerializer(objs, many=True).serialize_parallel(
+            workers=2, chunksize=7)
+        self.assertEqual(data, expected)
+
+    def test_executor(self):
+        objs = make_objs(10)
+        executor = DummyExecutor()
+        data = ParentSerializer().serialize_parallel(
+            iter(objs), chunksize=3, executor=executor)
+        self.assertEqual(data,
+                         ParentSerializer(objs, many=True).representation)
+        self.assertEqual(executor.calls, 4)
+
+    def test_empty(self):
+        executor = DummyExecutor()
+        self.assertEqual(
+            ParentSerializer().serialize_parallel([], executor=executor), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
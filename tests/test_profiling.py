@@ -0,0 +1,74 @@
+import unittest
+
+from serpy.fields import Field, IntField, MethodField
+from serpy.profiling import FieldProfile
+from serpy.serializer import Serializer
+from tests.obj import Obj
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class ASerializer(Serializer):
+    a = IntField()
+    slow = MethodField()
+
+    def get_slow(self, obj):
+        return obj.a * 2
+
+
+class BSerializer(Serializer):
+    b = Field(required=False, call=True)
+    many_a = ASerializer(many=True)
+
+
+class TestFieldProfile(unittest.TestCase):
+
+    def test_profile(self):
+        profile = FieldProfile(timer=FakeTimer())
+        objs = [Obj(b=lambda: 1, many_a=[Obj(a='1'), Obj(a='2')]),
+                Obj(b=None, many_a=[])]
+        data = BSerializer(objs, many=True, profile=profile).representation
+        self.assertEqual(data,
+                         BSerializer(objs, many=True).representation)
+
+        report = dict((stats.field, stats) for stats in profile.report())
+        self.assertEqual(sorted(report), ['ASerializer.a', 'ASerializer.slow',
+                                          'BSerializer.b',
+                                          'BSerializer.many_a'])
+        self.assertEqual(report['ASerializer.a'].calls, 2)
+        self.assertEqual(report['BSerializer.many_a'].calls, 2)
+        self.assertEqual(report['BSerializer.b'].total, 2)
+        # Nested time is included in the field of the nested serializer.
+        self.assertEqual(report['BSerializer.many_a'].total, 10)
+        self.assertEqual(profile.report()[0].field, 'BSerializer.many_a')
+
+        text = profile.format_report(limit=2)
+        self.assertEqual(len(text.splitlines()), 3)
+        self.assertIn('BSerializer.many_a', text)
+
+        profile.clear()
+        self.assertEqual(profile.report(), [])
+
+    def test_no_overhead_when_disabled(self):
+        BSerializer(Obj(b=None, many_a=[]), profile=FieldProfile())
+        self.assertTrue(BSerializer._compiled_serialize is not None)
+        getter = ASerializer._compiled_read_fields[0][1]
+        self.assertFalse(getattr(getter, '__name__', '') == 'profiled_getter')
+
+    def test_lazy(self):
+        profile = FieldProfile()
+        data = ASerializer(iter([Obj(a=1)]), many=True, lazy=True,
+                           profile=profile).representation
+        self.assertEqual(list(data), [{'a': 1, 'slow': 2}])
+        self.assertEqual(len(profile.report()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,25 @@
+import json
+import pickle
 import unittest
 import warnings
 
-from serpy.fields import Field, MethodField, IntField, FloatField, StrField
-from serpy.serializer import Serializer, DictSerializer
+from serpy.fields import (
+    BatchMethodField, DictField, Field, ListField, MethodField, IntField,
+    FloatField, StrField)
+from serpy.serializer import Serializer, DictSerializer, RowSerializer
 from tests.obj import Obj
 
 
+class RecordSerializer(Serializer):
+    record = True
+    intern_strings = ['name']
+
+    id = IntField()
+    name = StrField()
+    note = Field(required=False)
+    computed = Field(call=True)
+
+
 class TestSerializer(unittest.TestCase):
 
     def test_simple(self):
@@ -222,6 +236,62 @@ class TestSerializer(unittest.TestCase):
         self.assertEqual(obj.a, 2)
         self.assertEqual(obj.foo, 'hello')
 
+    def test_row_serializer(self):
+        class ASerializer(RowSerializer):
+            columns = ('b', 'a')
+
+            a = IntField()
+            c = Field(attr='b')
+
+        self.assertEqual(ASerializer([('x', '1'), ('y', 2)], many=True)
+                         .representation,
+                         [{'a': 1, 'c': 'x'}, {'a': 2, 'c': 'y'}])
+
+        class BSerializer(RowSerializer):
+            a = IntField()
+            plus = MethodField()
+
+            def get_plus(self, row):
+                return row[0] + 1
+
+        description = [('z', None), ('a', None, None)]
+        serializer_cls = BSerializer.for_columns(description)
+        self.assertIs(serializer_cls, BSerializer.for_columns(['z', 'a']))
+        self.assertEqual(serializer_cls((5, '3')).representation,
+                         {'a': 3, 'plus': 6})
+        # Without columns, rows are read by key.
+        self.assertEqual(BSerializer({'a': 4, 0: 1}).representation,
+                         {'a': 4, 'plus': 2})
+        self.assertRaises(ValueError, BSerializer.for_columns, ['b'])
+
+    def test_list_and_dict_fields(self):
+        class ChildSerializer(Serializer):
+            _cls = Obj
+            x = IntField()
+
+        class ASerializer(Serializer):
+            _cls = Obj
+            ids = ListField(IntField())
+            tags = ListField(Field())
+            scores = DictField(FloatField(), required=False)
+            children = ListField(ChildSerializer())
+
+        tags = ['a', 'b']
+        obj = Obj(ids=('1', '2'), tags=tags, scores={'a': '0.5'},
+                  children=[Obj(x='3')])
+        data = ASerializer(obj).representation
+        self.assertEqual(data, {'ids': [1, 2], 'tags': ['a', 'b'],
+                                'scores': {'a': 0.5},
+                                'children': [{'x': 3}]})
+        self.assertIs(data['tags'], tags)
+        self.assertIsNone(ASerializer(
+            Obj(ids=[], tags=[], scores=None, children=[])
+        ).representation['scores'])
+
+        obj = ASerializer(data=data).internal_value
+        self.assertEqual(obj.ids, [1, 2])
+        self.assertEqual(obj.children[0].x, 3)
+
     def test_dotted_attr(self):
         class ASerializer(Serializer):
             _cls = Obj
@@ -329,5 +399,530 @@ class TestSerializer(unittest.TestCase):
             self.assertTrue(issubclass(w[-1].category, DeprecationWarning))
             self.assertIn('deprecated', str(w[-1].message))
 
+    def test_compiled_serialize(self):
+        class ASerializer(Serializer):
+            a = IntField()
+            b = IntField(required=False, call=True)
+            c = Field(required=False)
+            d = MethodField()
+
+            def get_d(self, obj):
+                return obj.a * 2
+
+        self.assertTrue(ASerializer._compiled_serialize is not None)
+        o = Obj(a='5', b=lambda: '6', c=None)
+        self.assertEqual(ASerializer(o).representation,
+                         {'a': 5, 'b': 6, 'c': None, 'd': '55'})
+        o = Obj(a='1', b=None, c=3)
+        self.assertEqual(ASerializer(o).representation,
+                         {'a': 1, 'b': None, 'c': 3, 'd': '11'})
+
+    def test_overridden_serialize_falls_back(self):
+        class ASerializer(Serializer):
+            a = Field()
+
+            def _serialize(self, obj, fields):
+                v = super(ASerializer, self)._serialize(obj, fields)
+                v['extra'] = True
+                return v
+
+        self.assertTrue(ASerializer._compiled_serialize is None)
+        data = ASerializer([Obj(a=1)], many=True).representation
+        self.assertEqual(data, [{'a': 1, 'extra': True}])
+
+    def test_compiled_deserialize_plain_class(self):
+        class Plain(object):
+            pass
+
+        class Slotted(object):
+            __slots__ = ('a', 'b')
+
+        class ASerializer(Serializer):
+            _cls = Plain
+
+            a = IntField()
+            b = IntField(required=False)
+
+        obj = ASerializer(data={'a': '1', 'b': None}).internal_value
+        self.assertTrue(type(obj) is Plain)
+        self.assertEqual(obj.__dict__, {'a': 1, 'b': None})
+
+        class BSerializer(ASerializer):
+            _cls = Slotted
+
+        obj = BSerializer(data={'a': '1', 'b': '2'}).internal_value
+        self.assertTrue(type(obj) is Slotted)
+        self.assertEqual((obj.a, obj.b), (1, 2))
+
+        # Changing _cls after the serializer is created still works.
+        ASerializer._cls = Obj
+        obj = ASerializer(data={'a': '3'}).internal_value
+        self.assertTrue(type(obj) is Obj)
+        self.assertEqual((obj.a, obj.b), (3, None))
+
+    def test_compiled_deserialize_keeps_init(self):
+        class WithInit(object):
+            def __init__(self):
+                self.created = True
+
+        class ASerializer(Serializer):
+            _cls = WithInit
+
+            a = IntField()
+
+        obj = ASerializer(data={'a': '1'}).internal_value
+        self.assertTrue(obj.created)
+        self.assertEqual(obj.a, 1)
+
+    def test_overridden_deserialize_falls_back(self):
+        class ASerializer(Serializer):
+            _cls = Obj
+
+            a = Field()
+
+            def _deserialize(self, data, fields):
+                v = super(ASerializer, self)._deserialize(data, fields)
+                v.extra = True
+                return v
+
+        self.assertTrue(ASerializer._compiled_deserialize is None)
+        objs = ASerializer(data=[{'a': 1}], many=True).internal_value
+        self.assertEqual((objs[0].a, objs[0].extra), (1, True))
+
+    def test_iter_representation(self):
+        class ASerializer(Serializer):
+            a = IntField()
+
+        consumed = []
+
+        def objs():
+            for i in range(3):
+                consumed.append(i)
+                yield Obj(a=str(i))
+
+        it = ASerializer(objs(), many=True).iter_representation()
+        self.assertEqual(next(it), {'a': 0})
+        self.assertEqual(consumed, [0])
+        self.assertEqual(list(it), [{'a': 1}, {'a': 2}])
+
+        it = ASerializer(Obj(a='4')).iter_representation()
+        self.assertEqual(list(it), [{'a': 4}])
+
+    def test_iter_representation_options(self):
+        class ASerializer(Serializer):
+            a = IntField()
+            b = Field()
+
+        objs = [Obj(a=1, b=2), Obj(a=3, b=4)]
+        it = ASerializer(iter(objs), many=True,
+                         fields=['a']).iter_representation()
+        self.assertEqual(next(it), {'a': 1})
+        self.assertEqual(list(it), [{'a': 3}])
+        it = ASerializer(objs, many=True, rows=True).iter_representation()
+        self.assertEqual(list(it), [(1, 2), (3, 4)])
+        it = ASerializer(objs, many=True, exclude=['a'],
+                         dedupe=True).iter_representation()
+        self.assertEqual(list(it), [{'b': 2}, {'b': 4}])
+
+    def test_lazy(self):
+        class ASerializer(Serializer):
+            a = IntField()
+
+        class BSerializer(Serializer):
+            b = ASerializer(many=True, lazy=True)
+
+        serializer = ASerializer((Obj(a=i) for i in range(3)), many=True,
+                                 lazy=True)
+        data = serializer.representation
+        self.assertFalse(isinstance(data, list))
+        self.assertEqual(list(data), [{'a': 0}, {'a': 1}, {'a': 2}])
+
+        # Nested lazy serializers build lists, as the parent's dict is cached.
+        serializer = BSerializer(Obj(b=[Obj(a=1), Obj(a=2)]))
+        self.assertEqual(serializer.representation['b'], [{'a': 1}, {'a': 2}])
+        self.assertEqual(serializer.representation['b'], [{'a': 1}, {'a': 2}])
+        self.assertEqual(
+            json.loads(''.join(serializer.iter_json())),
+            {'b': [{'a': 1}, {'a': 2}]})
+        data = BSerializer(Obj(b=iter([Obj(a=3)])), fields=['b.a'],
+                           dedupe=True).representation
+        self.assertEqual(data, {'b': [{'a': 3}]})
+
+    def test_dedupe(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = MethodField()
+
+            def get_a(self, obj):
+                calls.append(obj)
+                return obj.a
+
+        class BSerializer(Serializer):
+            a = ASerializer()
+            many_a = ASerializer(many=True)
+
+        class CSerializer(Serializer):
+            b = BSerializer()
+
+        shared = Obj(a=1)
+        other = Obj(a=2)
+        objs = [Obj(b=Obj(a=shared, many_a=[shared, other]))
+                for _ in range(3)]
+
+        expected = CSerializer(objs, many=True).representation
+        self.assertEqual(len(calls), 9)
+        del calls[:]
+
+        data = CSerializer(objs, many=True, dedupe=True).representation
+        self.assertEqual(data, expected)
+        # The two ASerializer fields are memoized separately.
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(data[0]['b']['a'] is data[2]['b']['a'])
+
+        # Nothing is shared between calls.
+        del calls[:]
+        CSerializer(objs, many=True, dedupe=True).representation
+        self.assertEqual(len(calls), 3)
+
+        del calls[:]
+        data = CSerializer(iter(objs), many=True, dedupe=True,
+                           lazy=True).representation
+        self.assertEqual(list(data), expected)
+        self.assertEqual(len(calls), 3)
+
+    def test_projection(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = Field()
+            b = Field()
+            c = MethodField()
+
+            def get_c(self, obj):
+                calls.append(obj)
+                return obj.a + obj.b
+
+        class BSerializer(Serializer):
+            x = ASerializer(fields=['b'])
+            y = ASerializer(exclude=['c'], many=True)
+
+        o = Obj(a=1, b=2)
+        self.assertEqual(ASerializer(o, fields=['a', 'b']).representation,
+                         {'a': 1, 'b': 2})
+        self.assertEqual(ASerializer(o, exclude=['a', 'b']).representation,
+                         {'c': 3})
+        self.assertEqual(
+            ASerializer([o], fields=['a', 'c'], exclude=['c'],
+                        many=True).representation,
+            [{'a': 1}])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(BSerializer(Obj(x=o, y=[o])).representation,
+                         {'x': {'b': 2}, 'y': [{'a': 1, 'b': 2}]})
+        self.assertEqual(len(calls), 1)
+
+        # The reduced fields are compiled once per projection.
+        variant = ASerializer._read_variant(
+            projection=ASerializer(fields=['a'])._projection)
+        self.assertTrue(variant is ASerializer._read_variant(
+            projection=ASerializer(fields=('a',))._projection))
+        self.assertEqual([f[0] for f in variant[0]], ['a'])
+
+        serializer = ASerializer(o, fields=['a', 'nope'])
+        self.assertRaises(ValueError, lambda: serializer.representation)
+
+    def test_nested_projection(self):
+        calls = []
+
+        class AuthorSerializer(Serializer):
+            name = Field()
+            email = MethodField()
+
+            def get_email(self, obj):
+                calls.append('email')
+                return obj.email
+
+        class CommentSerializer(Serializer):
+            body = Field()
+            author = AuthorSerializer()
+
+        class PostSerializer(Serializer):
+            id = Field()
+            author = AuthorSerializer()
+            comments = CommentSerializer(many=True)
+            public_comments = CommentSerializer(many=True, exclude=['author'],
+                                                attr='comments')
+
+        author = Obj(name='a', email='a@x')
+        post = Obj(id=1, author=author,
+                   comments=[Obj(body='hi', author=author)])
+
+        data = PostSerializer(
+            post, fields=['id', 'author.name', 'comments.body']).representation
+        self.assertEqual(data, {'id': 1, 'author': {'name': 'a'},
+                                'comments': [{'body': 'hi'}]})
+        self.assertEqual(calls, [])
+
+        data = PostSerializer(
+            post, fields=['comments.author.name', 'comments'],
+            exclude=['author.email']).representation
+        self.assertEqual(data, {'comments': [
+            {'body': 'hi', 'author': {'name': 'a', 'email': 'a@x'}}]})
+
+        data = PostSerializer(
+            post, exclude=['comments.author.email', 'author', 'id',
+                           'public_comments.body']).representation
+        self.assertEqual(data, {
+            'comments': [{'body': 'hi', 'author': {'name': 'a'}}],
+            'public_comments': [{}]})
+        self.assertEqual(calls, ['email'])
+
+        # The field's own projection can't be widened by a dotted path.
+        data = PostSerializer(
+            post, fields=['public_comments.author']).representation
+        self.assertEqual(data, {'public_comments': [{}]})
+        self.assertRaises(
+            ValueError,
+            lambda: PostSerializer(post, fields=['id.foo']).representation)
+
+        data = PostSerializer([post], many=True, dedupe=True,
+                              fields=['comments.author.name']).representation
+        self.assertEqual(data, [{'comments': [{'author': {'name': 'a'}}]}])
+
+    def test_rows(self):
+        class ASerializer(Serializer):
+            a = IntField()
+            b = Field(required=False)
+
+        class BSerializer(Serializer):
+            x = Field()
+            a = ASerializer()
+            many_a = ASerializer(many=True)
+
+        o = Obj(x=1, a=Obj(a='2', b=None), many_a=[Obj(a=3, b=4)])
+        self.assertEqual(BSerializer(o, rows=True).representation,
+                         (1, (2, None), [(3, 4)]))
+        self.assertEqual(BSerializer.row_header(),
+                         ('x', ('a', ('a', 'b')), ('many_a', ('a', 'b'))))
+        self.assertEqual(
+            BSerializer([o], many=True, rows=True,
+                        fields=['a.b', 'x']).representation,
+            [(1, (None,))])
+        self.assertEqual(BSerializer.row_header(fields=['a.b', 'x']),
+                         ('x', ('a', ('b',))))
+        self.assertEqual(ASerializer(Obj(a=1, b=2), rows=True,
+                                     fields=['b']).representation, (2,))
+
+        class CSerializer(Serializer):
+            a = ASerializer(rows=True)
+
+        self.assertEqual(CSerializer(o).representation, {'a': (2, None)})
+
+    def test_rows_fallback(self):
+        class ASerializer(Serializer):
+            a = Field()
+            b = Field()
+
+            def _serialize(self, obj, fields):
+                return super(ASerializer, self)._serialize(obj, fields)
+
+        self.assertEqual(ASerializer(Obj(a=1, b=2), rows=True).representation,
+                         (1, 2))
+
+    def test_record(self):
+        cls = RecordSerializer._cls
+        self.assertEqual(cls.__slots__, ('id', 'name', 'note'))
+        name = ''.join(['re', 'cord'])
+        objs = RecordSerializer(
+            data=[{'id': '1', 'name': name}, {'id': 2, 'name': 'record'}],
+            many=True).internal_value
+        self.assertTrue(type(objs[0]) is cls)
+        self.assertFalse(hasattr(objs[0], '__dict__'))
+        self.assertEqual((objs[0].id, objs[0].name, objs[0].note),
+                         (1, 'record', None))
+        self.assertTrue(objs[0].name is objs[1].name)
+        self.assertEqual(repr(objs[0]),
+                         "RecordSerializerRecord(id=1, name='record', "
+                         "note=None)")
+
+        copy = pickle.loads(pickle.dumps(objs[0]))
+        self.assertEqual((copy.id, copy.name), (1, 'record'))
+
+        class SubSerializer(RecordSerializer):
+            extra = Field()
+
+        self.assertEqual(SubSerializer._cls.__slots__,
+                         ('id', 'name', 'note', 'extra'))
+
+        class ExplicitSerializer(RecordSerializer):
+            _cls = Obj
+
+        self.assertTrue(ExplicitSerializer._cls is Obj)
+
+    def test_compile(self):
+        class ChildSerializer(Serializer):
+            x = IntField()
+
+        class ASerializer(Serializer):
+            a = Field()
+            b = MethodField()
+            child = ChildSerializer()
+
+            def get_b(self, obj):
+                return obj.a * 2
+
+        objs = [Obj(a=1, child=Obj(x='2')), Obj(a=3, child=Obj(x=4))]
+        serialize = ASerializer.compile()
+        self.assertEqual(serialize(objs[0]),
+                         ASerializer(objs[0]).representation)
+        serialize_many = ASerializer.compile(many=True)
+        self.assertEqual(serialize_many(objs),
+                         ASerializer(objs, many=True).representation)
+        self.assertEqual(serialize_many(iter(objs))[1],
+                         {'a': 3, 'b': 6, 'child': {'x': 4}})
+
+        serialize = ASerializer.compile(fields=['b', 'child.x'], rows=True)
+        self.assertEqual(serialize(objs[0]), (2, (2,)))
+
+    def test_compile_fallback(self):
+        class ASerializer(Serializer):
+            a = Field()
+
+            def to_representation(self, obj):
+                result = super(ASerializer, self).to_representation(obj)
+                if self.many:
+                    return {'items': result}
+                return result
+
+        serialize_many = ASerializer.compile(many=True)
+        self.assertEqual(serialize_many([Obj(a=1)]), {'items': [{'a': 1}]})
+
+    def test_batch_method_field(self):
+        calls = []
+
+        class CommentSerializer(Serializer):
+            text = Field()
+            length = BatchMethodField()
+
+            def get_length(self, comments):
+                calls.append(('length', len(comments)))
+                return dict((c, len(c.text)) for c in comments if c.text)
+
+        class PostSerializer(Serializer):
+            id = IntField()
+            double = BatchMethodField('get_doubles')
+            comments = CommentSerializer(many=True)
+            top = CommentSerializer(required=False)
+
+            def get_doubles(self, posts):
+                calls.append(('double', len(posts)))
+                return [post.id * 2 for post in posts]
+
+        shared = Obj(text='ab')
+        posts = [Obj(id=i, comments=[shared, Obj(text='c' * i)], top=None)
+                 for i in range(3)]
+        posts[0].top = shared
+        data = PostSerializer(iter(posts), many=True).representation
+        # One call per serializer: top is a separate nested serializer.
+        self.assertEqual(sorted(calls),
+                         [('double', 3), ('length', 1), ('length', 4)])
+        self.assertEqual(data[1], {
+            'id': 1, 'double': 2, 'top': None,
+            'comments': [{'text': 'ab', 'length': 2},
+                         {'text': 'c', 'length': 1}]})
+        self.assertEqual(data[0]['top'], {'text': 'ab', 'length': 2})
+        # Objects missing from the mapping get None.
+        self.assertEqual(data[0]['comments'][1], {'text': '', 'length': None})
+
+        del calls[:]
+        data = PostSerializer(posts[2], exclude=['comments']).representation
+        self.assertEqual(data['double'], 4)
+        self.assertEqual(calls, [('double', 1)])
+
+        # Lazy serializers call the method with one object at a time.
+        del calls[:]
+        list(PostSerializer(posts, many=True, lazy=True,
+                            fields=['double']).representation)
+        self.assertEqual(calls, [('double', 1)] * 3)
+
+        serialize_many = PostSerializer.compile(many=True, fields=['double'])
+        self.assertEqual(serialize_many(posts),
+                         [{'double': 0}, {'double': 2}, {'double': 4}])
+
+    def test_batch_method_field_wrong_length(self):
+        class ASerializer(Serializer):
+            a = BatchMethodField()
+
+            def get_a(self, objs):
+                return [1]
+
+        self.assertRaises(ValueError, lambda: ASerializer(
+            [Obj(), Obj()], many=True).representation)
+
+    def test_access_plan(self):
+        class AuthorSerializer(Serializer):
+            name = Field()
+            email = Field()
+            posts = MethodField()
+
+            def get_posts(self, obj):
+                return len(obj.posts)
+
+        class CommentSerializer(Serializer):
+            text = Field()
+            author_name = Field(attr='author.name')
+
+        class PostSerializer(Serializer):
+            title = Field()
+            body = Field(call=True)
+            author = AuthorSerializer(fields=['name', 'posts'])
+            author_id = Field(attr='author.id')
+            comments = CommentSerializer(many=True, attr='comment_set')
+
+        plan = PostSerializer.access_plan()
+        self.assertEqual(plan.paths(), [
+            'author.id', 'author.name', 'body', 'comment_set.author.name',
+            'comment_set.text', 'title'])
+        self.assertEqual(plan.collections(), ['comment_set'])
+        self.assertFalse(plan.many)
+        self.assertEqual(plan.attrs['author'].computed, ('posts',))
+        self.assertTrue(plan.attrs['comment_set'].many)
+
+        plan = PostSerializer.access_plan(
+            fields=['title', 'comments.text'])
+        self.assertEqual(plan.paths(), ['comment_set.text', 'title'])
+
+    def test_access_plan_computed_only(self):
+        class ASerializer(Serializer):
+            a = MethodField()
+
+            def get_a(self, obj):
+                return 1
+
+        class BSerializer(Serializer):
+            title = Field()
+            author = ASerializer()
+            tags = ASerializer(many=True)
+
+        plan = BSerializer.access_plan()
+        self.assertEqual(plan.paths(), ['author', 'tags', 'title'])
+        self.assertEqual(plan.collections(), ['tags'])
+
+    def test_intern_strings(self):
+        class ASerializer(Serializer):
+            _cls = Obj
+            intern_strings = True
+
+            a = Field()
+            b = Field(required=False)
+
+        a = ''.join(['x', 'y'])
+        b = ''.join(['x', 'y'])
+        obj = ASerializer(data={'a': a, 'b': b}).internal_value
+        self.assertTrue(obj.a is obj.b)
+        obj = ASerializer(data={'a': 5}).internal_value
+        self.assertEqual((obj.a, obj.b), (5, None))
+
+
 if __name__ == '__main__':
     unittest.main()